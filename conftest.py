@@ -0,0 +1 @@
+"""Marks the repository root as pytest's rootdir so tests import src.* without path setup"""
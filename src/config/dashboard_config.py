@@ -1,7 +1,9 @@
 """Configuration file for CredTech XScore Dashboard"""
 
 import os
-from typing import Dict, Any, List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping
 from dataclasses import dataclass
 
 @dataclass
@@ -247,6 +249,11 @@ load_config_from_env()
 # Configuration validation
 def validate_config() -> List[str]:
     """Validate configuration and return any errors"""
+    return list(_validate_config())
+
+@lru_cache(maxsize=1)
+def _validate_config() -> tuple:
+    """Validation errors for the current configuration, cached until an update_* call"""
     errors = []
     
     # Dashboard config validation
@@ -277,7 +284,7 @@ def validate_config() -> List[str]:
     if monitoring_config.prometheus_port <= 0 or monitoring_config.prometheus_port > 65535:
         errors.append("Prometheus port must be between 1 and 65535")
     
-    return errors
+    return tuple(errors)
 
 # Configuration getters
 def get_dashboard_config() -> DashboardConfig:
@@ -304,16 +311,17 @@ def get_data_config() -> DataConfig:
     """Get data configuration"""
     return data_config
 
-def get_all_configs() -> Dict[str, Any]:
-    """Get all configurations as a dictionary"""
-    return {
+@lru_cache(maxsize=1)
+def get_all_configs() -> Mapping[str, Any]:
+    """Get all configurations as a read-only mapping"""
+    return MappingProxyType({
         'dashboard': dashboard_config,
         'security': security_config,
         'performance': performance_config,
         'monitoring': monitoring_config,
         'ui': ui_config,
         'data': data_config
-    }
+    })
 
 # Configuration update functions
 def update_dashboard_config(**kwargs):
@@ -321,18 +329,21 @@ def update_dashboard_config(**kwargs):
     for key, value in kwargs.items():
         if hasattr(dashboard_config, key):
             setattr(dashboard_config, key, value)
+    _validate_config.cache_clear()
 
 def update_security_config(**kwargs):
     """Update security configuration"""
     for key, value in kwargs.items():
         if hasattr(security_config, key):
             setattr(security_config, key, value)
+    _validate_config.cache_clear()
 
 def update_performance_config(**kwargs):
     """Update performance configuration"""
     for key, value in kwargs.items():
         if hasattr(performance_config, key):
             setattr(performance_config, key, value)
+    _validate_config.cache_clear()
 
 # Configuration export/import
 def export_config_to_dict() -> Dict[str, Any]:
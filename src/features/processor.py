@@ -12,12 +12,21 @@ class FeatureProcessor:
         self.feature_columns = []
         self.categorical_features = []
         self.numerical_features = []
+        # Issuers that get an indicator column; replaced by those seen in fit_transform
+        self._set_known_issuers(('ABC', 'LMN', 'QRS', 'XYZ'))
+    
+    def _set_known_issuers(self, issuers):
+        self.known_issuers = tuple(issuers)
+        self._issuer_dtype = pd.CategoricalDtype(self.known_issuers)
     
     def fit_transform(self, structured_df: pd.DataFrame, news_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
         """Process raw data into features"""
         # Make a copy to avoid modifying the original
         df = structured_df.copy()
         
+        if 'issuer' in df.columns:
+            self._set_known_issuers(sorted(df['issuer'].dropna().astype(str).unique()))
+        
         # Basic feature engineering on structured data
         df = self._process_structured_data(df)
         
@@ -47,20 +56,6 @@ class FeatureProcessor:
             if col not in df.columns and col != 'target':
                 print(f"Warning: Feature {col} is missing, filling with zeros")
                 df[col] = 0
-                
-        # Ensure all issuer columns are present
-        issuers = ['ABC', 'LMN', 'QRS', 'XYZ']
-        for issuer in issuers:
-            col_name = f'issuer_{issuer}'
-            if col_name not in df.columns:
-                df[col_name] = 0
-                
-        # Set the correct issuer column to 1
-        if 'issuer' in df.columns:
-            for idx, row in df.iterrows():
-                issuer_col = f"issuer_{row['issuer']}"
-                if issuer_col in df.columns:
-                    df.at[idx, issuer_col] = 1
         
         return df
     
@@ -70,22 +65,32 @@ class FeatureProcessor:
         if 'asof_date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['asof_date']):
             df['asof_date'] = pd.to_datetime(df['asof_date'])
         
-        # Extract date features
-        df['month'] = df['asof_date'].dt.month
-        df['day_of_week'] = df['asof_date'].dt.dayofweek
-        df['day_of_month'] = df['asof_date'].dt.day
+        # Extract date features; each fits in int8
+        dates = df['asof_date'].dt
+        df['month'] = dates.month.astype(np.int8)
+        df['day_of_week'] = dates.dayofweek.astype(np.int8)
+        df['day_of_month'] = dates.day.astype(np.int8)
         
-        # Create ratio features
-        if 'balance' in df.columns and 'income' in df.columns:
-            df['balance_to_income'] = df['balance'] / df['income'].replace(0, 1)
-        
-        if 'transactions' in df.columns and 'income' in df.columns:
-            df['transactions_to_income'] = df['transactions'] / (df['income'] / 10000)
-        
-        # One-hot encode categorical variables
-        if 'issuer' in df.columns:
-            issuer_dummies = pd.get_dummies(df['issuer'], prefix='issuer')
-            df = pd.concat([df, issuer_dummies], axis=1)
+        # Create ratio features on the underlying float64 arrays
+        if 'income' in df.columns:
+            income = df['income'].to_numpy(dtype=np.float64)
+            
+            if 'balance' in df.columns:
+                balance = df['balance'].to_numpy(dtype=np.float64)
+                # Zero income divides by 1, leaving the balance itself
+                df['balance_to_income'] = np.divide(balance, income, out=balance.copy(), where=income != 0)
+            
+            if 'transactions' in df.columns:
+                transactions = df['transactions'].to_numpy(dtype=np.float64)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    df['transactions_to_income'] = transactions / (income / 10000)
+        
+        # One-hot encode issuers against the known categories as sparse int8
+        # columns; unknown issuers get all-zero rows
+        issuers = df['issuer'].astype(str) if 'issuer' in df.columns else pd.Series(np.nan, index=df.index)
+        issuer_dummies = pd.get_dummies(issuers.astype(self._issuer_dtype), prefix='issuer',
+                                        sparse=True, dtype=np.int8)
+        df = pd.concat([df.drop(columns=issuer_dummies.columns, errors='ignore'), issuer_dummies], axis=1)
         
         return df
     
@@ -6,8 +6,8 @@ from typing import Dict, List, Optional
 from src.ingest.structured import DataIngestionManager, CSVDataSource, DatabaseDataSource
 from src.ingest.unstructured import NewsDataSource, SocialMediaDataSource
 
-def run_ingestion(output_path: str = 'data/processed/combined_data.csv'):
-    """Run the full ingestion pipeline"""
+def run_structured_ingestion(output_path: str = 'data/processed/combined_data.csv') -> pd.DataFrame:
+    """Ingest the structured financial data and save it to output_path"""
     import os
     from src.utils.logging import get_app_logger
     
@@ -114,17 +114,29 @@ def run_ingestion(output_path: str = 'data/processed/combined_data.csv'):
     # Ingest structured data
     structured_df = manager.ingest_all()
     
-    # Ingest news data (unstructured)
+    # Save the raw ingested data
+    manager.save_ingested_data(structured_df, output_path)
+    
+    return structured_df
+
+def run_news_ingestion(output_path: str = os.path.join('data', 'processed', 'news_data.csv')) -> pd.DataFrame:
+    """Ingest the news data (unstructured) and save it to output_path"""
     news_source = NewsDataSource(name="news_data")
     news_df = news_source.load_data()
     
-    # Save the raw ingested data
-    manager.save_ingested_data(structured_df, output_path)
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    news_df.to_csv(output_path, index=False)
+    
+    return news_df
+
+def run_ingestion(output_path: str = 'data/processed/combined_data.csv'):
+    """Run the full ingestion pipeline
     
-    # Save news data separately
-    news_output_path = os.path.join('data', 'processed', 'news_data.csv')
-    Path(news_output_path).parent.mkdir(parents=True, exist_ok=True)
-    news_df.to_csv(news_output_path, index=False)
+    The structured and news stages are independent and can also be run
+    separately with run_structured_ingestion() and run_news_ingestion().
+    """
+    structured_df = run_structured_ingestion(output_path)
+    news_df = run_news_ingestion()
     
     print(f"Ingestion complete. Structured data: {structured_df.shape[0]} rows, News data: {news_df.shape[0]} rows")
     
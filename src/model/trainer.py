@@ -9,7 +9,7 @@ from datetime import datetime
 
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from lightgbm import LGBMClassifier
+from lightgbm import LGBMClassifier, early_stopping, log_evaluation
 import shap
 
 from src.utils.metrics import eval_all, save_metrics_plot
@@ -82,8 +82,7 @@ class CreditScoreModel:
             categorical_feature=self.categorical_features,
             eval_set=[(X_test, y_test)],
             eval_metric='auc',
-            early_stopping_rounds=10,
-            verbose=10
+            callbacks=[early_stopping(10), log_evaluation(10)]
         )
         
         # Make predictions
@@ -220,6 +219,23 @@ class CreditScoreModel:
             "contributions": feature_contributions,
             "score": score
         }
+    
+    def save(self, path: str) -> bool:
+        """Save the model to path with joblib"""
+        return save_model(self, path)
+    
+    def load(self, path: str, mmap_mode: Optional[str] = None) -> 'CreditScoreModel':
+        """Load a model saved with save() into this instance
+        
+        Args:
+            path: Path of the saved model
+            mmap_mode: Passed to joblib.load; with 'r' the numpy arrays in the
+                file are memory-mapped read-only instead of read into memory,
+                so code that modifies them must .copy() them first
+        """
+        loaded = joblib.load(path, mmap_mode=mmap_mode)
+        self.__dict__.update(vars(loaded))
+        return self
 
 def save_training_artifacts(model: CreditScoreModel, results: Dict, output_dir: str = 'models', version: str = None, register: bool = False):
     """Save model and training artifacts
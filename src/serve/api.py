@@ -3,11 +3,12 @@
 import os
 import sys
 import joblib
+import orjson
 import pandas as pd
 from typing import Dict, List, Optional, Any, Union
 from fastapi import FastAPI, HTTPException, Depends, Query, Path, Body, status, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.exception_handlers import http_exception_handler
 from src.utils.validation import BaseModel, Field, validator
@@ -51,6 +52,12 @@ load_dotenv()
 
 # JWT settings are now handled by the security module
 
+class NumpyORJSONResponse(ORJSONResponse):
+    """ORJSONResponse that also encodes numpy scalars and arrays from the model"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="CredTech XScore API",
@@ -91,7 +98,9 @@ app = FastAPI(
     license_info={
         "name": "Proprietary",
         "url": "https://credtech.example.com/license",
-    }
+    },
+    # Serialize responses with orjson
+    default_response_class=NumpyORJSONResponse
 )
 
 # Add monitoring middleware
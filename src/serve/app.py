@@ -8,6 +8,7 @@ import joblib
 import time
 import traceback
 import uuid
+from collections import Counter, deque
 from datetime import datetime, timedelta
 from functools import wraps
 from typing import Dict, List, Any, Optional, Union
@@ -194,9 +195,12 @@ def load_credit_model():
 class EnhancedErrorHandler:
     """Enhanced error handling with detailed logging and user feedback"""
     
+    max_history = 100
+    
     def __init__(self):
-        self.error_counts = {}
-        self.error_history = []
+        self.error_counts = Counter()
+        # Most recent errors; the deque drops the oldest beyond maxlen
+        self.error_history = deque(maxlen=self.max_history)
     
     def handle_error(self, error: Exception, context: Dict[str, Any] = None, show_to_user: bool = True):
         """Handle errors with comprehensive logging and user feedback"""
@@ -213,22 +217,16 @@ class EnhancedErrorHandler:
             'traceback': traceback.format_exc()
         }
         
-        # Update error counts
-        if error_type not in self.error_counts:
-            self.error_counts[error_type] = 0
-        self.error_counts[error_type] += 1
-        
-        # Store in history
+        # Update error counts and history
+        self.error_counts.update((error_type,))
         self.error_history.append(error_info)
-        if len(self.error_history) > 100:
-            self.error_history = self.error_history[-100:]
         
         # Log to structured logging
         log_structured_error(
             error_type=error_type,
-            error_message=str(error),
-            source=context.get('source', 'unknown') if context else 'unknown',
-            context={
+            message=str(error),
+            details={
+                'source': context.get('source', 'unknown') if context else 'unknown',
                 'error_id': error_id,
                 **(context or {})
             },
@@ -356,30 +354,29 @@ def enhanced_security_check(func):
     return wrapper
 
 def check_rate_limit(user_id: str, max_requests: int = 60) -> bool:
-    """Check if user is within rate limits"""
-    current_time = time.time()
-    minute_ago = current_time - 60
-    
-    # Initialize rate limit tracking
-    if 'rate_limits' not in st.session_state:
-        st.session_state['rate_limits'] = {}
+    """Check if user is within rate limits
     
-    if user_id not in st.session_state['rate_limits']:
-        st.session_state['rate_limits'][user_id] = []
-    
-    # Clean old requests
-    st.session_state['rate_limits'][user_id] = [
-        timestamp for timestamp in st.session_state['rate_limits'][user_id]
-        if timestamp > minute_ago
-    ]
-    
-    # Check limit
-    if len(st.session_state['rate_limits'][user_id]) >= max_requests:
-        return False
+    Each user has a token bucket holding up to max_requests tokens, refilled
+    at max_requests per minute; a request takes one token.
+    """
+    now = time.monotonic()
+    buckets = st.session_state.setdefault('rate_limits', {})
+    bucket = buckets.get(user_id)
+    if bucket is None:
+        bucket = buckets[user_id] = {'tokens': float(max_requests), 'ts': now}
+    else:
+        # Refill for the time since the last request
+        refill = (now - bucket['ts']) * max_requests / 60
+        bucket['tokens'] = min(float(max_requests), bucket['tokens'] + refill)
+        bucket['ts'] = now
     
-    # Add current request
-    st.session_state['rate_limits'][user_id].append(current_time)
-    return True
+    if bucket['tokens'] >= 1:
+        bucket['tokens'] -= 1
+        return True
+    return False
+
+# Maximum dashboard session age (24 hours)
+SESSION_MAX_AGE_SECONDS = 24 * 60 * 60
 
 def validate_session(session_state: Dict[str, Any]) -> bool:
     """Validate current session"""
@@ -387,15 +384,21 @@ def validate_session(session_state: Dict[str, Any]) -> bool:
     if not session_state.get('authenticated'):
         return False
     
-    # Check session age
-    session_start = session_state.get('session_start')
-    if session_start:
-        try:
-            created_time = datetime.fromisoformat(session_start)
-            if datetime.now() - created_time > timedelta(hours=24):
-                return False
-        except ValueError:
+    # Check session age, preferring the numeric start timestamp set at login
+    session_start_ts = session_state.get('session_start_ts')
+    if session_start_ts is not None:
+        if time.time() - session_start_ts > SESSION_MAX_AGE_SECONDS:
             return False
+    else:
+        # Legacy sessions only carry an ISO start time
+        session_start = session_state.get('session_start')
+        if session_start:
+            try:
+                created_time = datetime.fromisoformat(session_start)
+                if datetime.now() - created_time > timedelta(seconds=SESSION_MAX_AGE_SECONDS):
+                    return False
+            except ValueError:
+                return False
     
     # Check user data
     if not session_state.get('username') or not session_state.get('user_role'):
@@ -814,10 +817,10 @@ def calculate_and_display_score(model):
         
         # Log prediction
         log_model_prediction(
-            model_version=getattr(model, 'version', 'unknown'),
-            input_features=inputs,
-            prediction=prediction.tolist(),
-            prediction_time=prediction_time
+            model_name=getattr(model, 'version', 'unknown'),
+            input_data=inputs,
+            prediction=prediction,
+            execution_time=prediction_time * 1000
         )
         
         # Display results
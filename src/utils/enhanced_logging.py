@@ -7,10 +7,11 @@ import platform
 import socket
 import uuid
 import sys
+from contextvars import ContextVar
 from datetime import datetime
 from functools import wraps
 from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
-from typing import Dict, Any, Optional, Union, List
+from typing import Dict, Any, Optional, Union, List, NamedTuple
 
 # Import custom log rotation handler
 from src.utils.log_rotation import CompressedRotatingFileHandler, setup_log_rotation, schedule_log_maintenance
@@ -40,6 +41,20 @@ SYSTEM_INFO = {
 # Ensure log directory exists
 os.makedirs(LOG_DIRECTORY, exist_ok=True)
 
+class RawJSON:
+    """Already-serialized JSON for a record's context
+    
+    JsonFormatter inserts it into the formatted line as is, and the bytes are
+    only decoded if a handler actually formats the record.
+    """
+    __slots__ = ('data',)
+    
+    def __init__(self, data: bytes):
+        self.data = data
+    
+    def __str__(self):
+        return self.data.decode()
+
 # Custom formatter for structured logging
 class JsonFormatter(logging.Formatter):
     """Format logs as JSON for better parsing and analysis"""
@@ -77,9 +92,13 @@ class JsonFormatter(logging.Formatter):
             
         # Add context data if available
         if hasattr(record, 'context'):
+            if isinstance(record.context, RawJSON):
+                # Context is the last key, so append its JSON after the others
+                return f'{json.dumps(log_data, default=str)[:-1]}, "context": {record.context}}}'
             log_data['context'] = record.context
             
-        return json.dumps(log_data)
+        # Context may carry values json cannot encode, such as numpy arrays
+        return json.dumps(log_data, default=str)
 
 # Setup main application logger
 def setup_logger(name, log_file=APP_LOG_FILE, level=logging.INFO, json_format=True):
@@ -648,6 +667,73 @@ def get_session_context():
         
     return context
 
+class SessionInfo(NamedTuple):
+    """The session context fields copied into structured log records"""
+    session_id: Any = ''
+    username: Any = ''
+    ip_address: Any = ''
+    user_agent: Any = ''
+    page: Any = ''
+
+def _session_info(context: Dict[str, Any]) -> SessionInfo:
+    return SessionInfo(
+        context.get('session_id', ''),
+        context.get('username', ''),
+        context.get('ip_address', ''),
+        context.get('user_agent', ''),
+        context.get('page', '')
+    )
+
+# (run marker, context, SessionInfo) of the last get_session_context() in this
+# execution context; every Streamlit script thread, and every asyncio task,
+# sees its own
+_context_cache: ContextVar[Optional[tuple]] = ContextVar('_context_cache', default=None)
+
+def _get_script_run_ctx():
+    """Return the active Streamlit ScriptRunContext, or None outside a script run"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx(suppress_warning=True)
+    except Exception:
+        return None
+
+def get_session_context_cached():
+    """Get the session context, computed at most once per Streamlit rerun
+    
+    Streamlit replaces ScriptRunContext.cursors at the start of every run, so
+    that object identifies the current rerun. Callers receive a shallow copy
+    they are free to modify. Outside a script run this is get_session_context().
+    """
+    ctx = _get_script_run_ctx()
+    if ctx is None:
+        return get_session_context()
+    return dict(_cached_context(ctx)[1])
+
+def get_session_info() -> SessionInfo:
+    """Get the session fields used by structured logs, computed at most once
+    per Streamlit rerun like get_session_context_cached()
+    
+    The tuple is immutable, so it is shared rather than copied.
+    """
+    ctx = _get_script_run_ctx()
+    if ctx is None:
+        return _session_info(get_session_context())
+    return _cached_context(ctx)[2]
+
+def _cached_context(ctx) -> tuple:
+    """Cache entry for the script run ctx belongs to, rebuilt on a new rerun"""
+    run_marker = ctx.cursors
+    cached = _context_cache.get()
+    if cached is None or cached[0] is not run_marker:
+        context = get_session_context()
+        cached = (run_marker, context, _session_info(context))
+        _context_cache.set(cached)
+    return cached
+
+def clear_session_context_cache():
+    """Drop the cached context, e.g. after the logged-in user changes"""
+    _context_cache.set(None)
+
 # Log with context information
 def log_with_context(logger, level, message, context=None, extra=None):
     """Log a message with context information"""
@@ -4,15 +4,22 @@ import os
 import time
 import logging
 import psutil
+import numpy as np
+import orjson
 from typing import Dict, Any, Optional, List, Callable
 from datetime import datetime, timedelta
 import threading
 import json
 from pathlib import Path
 
+from src.utils.performance import cpu_sampler
+
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# Initial number of endpoint slots in the per-endpoint counter arrays
+INITIAL_ENDPOINT_CAPACITY = 1024
+
 class MetricsCollector:
     """Collect and store system and application metrics"""
     
@@ -20,11 +27,16 @@ class MetricsCollector:
         self.app_name = app_name
         self.metrics = {}
         self.start_time = time.time()
-        self.request_counts = {}
-        self.response_times = {}
-        self.error_counts = {}
         self.last_collection_time = time.time()
         
+        # Endpoints are interned to integer ids indexing parallel counter arrays
+        self._endpoint_ids: Dict[str, int] = {}
+        self._req = np.zeros(INITIAL_ENDPOINT_CAPACITY, dtype=np.int64)
+        self._err = np.zeros(INITIAL_ENDPOINT_CAPACITY, dtype=np.int64)
+        self._rt_sum = np.zeros(INITIAL_ENDPOINT_CAPACITY, dtype=np.float64)
+        self._rt_n = np.zeros(INITIAL_ENDPOINT_CAPACITY, dtype=np.int64)
+        self._lock = threading.Lock()
+        
         # Create metrics directory if it doesn't exist
         self.metrics_dir = Path("logs/metrics")
         self.metrics_dir.mkdir(parents=True, exist_ok=True)
@@ -34,7 +46,7 @@ class MetricsCollector:
         metrics = {
             "timestamp": datetime.now().isoformat(),
             "cpu": {
-                "usage_percent": psutil.cpu_percent(interval=1),
+                "usage_percent": cpu_sampler.get(),
                 "count": psutil.cpu_count(),
             },
             "memory": {
@@ -53,72 +65,95 @@ class MetricsCollector:
         
         return metrics
     
+    def _id(self, endpoint: str) -> int:
+        """Get the counter index for an endpoint, assigning one if needed"""
+        i = self._endpoint_ids.get(endpoint)
+        if i is None:
+            with self._lock:
+                i = self._endpoint_ids.get(endpoint)
+                if i is None:
+                    i = len(self._endpoint_ids)
+                    if i == len(self._req):
+                        self._grow()
+                    self._endpoint_ids[endpoint] = i
+        return i
+    
+    def _grow(self):
+        """Double the capacity of the counter arrays; called with self._lock held"""
+        size = len(self._req)
+        self._req = np.concatenate([self._req, np.zeros(size, dtype=np.int64)])
+        self._err = np.concatenate([self._err, np.zeros(size, dtype=np.int64)])
+        self._rt_sum = np.concatenate([self._rt_sum, np.zeros(size, dtype=np.float64)])
+        self._rt_n = np.concatenate([self._rt_n, np.zeros(size, dtype=np.int64)])
+    
+    @property
+    def request_counts(self) -> Dict[str, int]:
+        """Request counts by endpoint for the current collection period"""
+        return dict(zip(self._endpoint_ids, self._req[:len(self._endpoint_ids)].tolist()))
+    
+    @property
+    def error_counts(self) -> Dict[str, int]:
+        """Error counts by endpoint for the current collection period"""
+        return dict(zip(self._endpoint_ids, self._err[:len(self._endpoint_ids)].tolist()))
+    
+    @property
+    def avg_response_times(self) -> Dict[str, float]:
+        """Average response times by endpoint for the current collection period"""
+        n = len(self._endpoint_ids)
+        rt_n = self._rt_n[:n]
+        averages = np.divide(self._rt_sum[:n], rt_n, out=np.zeros(n, dtype=np.float64), where=rt_n > 0)
+        return dict(zip(self._endpoint_ids, averages.tolist()))
+    
     def collect_app_metrics(self) -> Dict[str, Any]:
         """Collect application-specific metrics"""
         current_time = time.time()
         uptime = current_time - self.start_time
+        n = len(self._endpoint_ids)
+        requests = self._req[:n]
         
         # Calculate request rate (requests per second)
         elapsed = current_time - self.last_collection_time
-        request_rates = {}
-        for endpoint, count in self.request_counts.items():
-            request_rates[endpoint] = count / elapsed if elapsed > 0 else 0
-        
-        # Calculate average response times
-        avg_response_times = {}
-        for endpoint, times in self.response_times.items():
-            if times:  # Check if the list is not empty
-                avg_response_times[endpoint] = sum(times) / len(times)
-            else:
-                avg_response_times[endpoint] = 0
+        rates = requests / elapsed if elapsed > 0 else np.zeros(n, dtype=np.float64)
         
         metrics = {
             "timestamp": datetime.now().isoformat(),
             "uptime": uptime,
             "requests": {
-                "total": sum(self.request_counts.values()),
-                "by_endpoint": dict(self.request_counts),
-                "rates": request_rates,
+                "total": int(requests.sum()),
+                "by_endpoint": self.request_counts,
+                "rates": dict(zip(self._endpoint_ids, rates.tolist())),
             },
             "response_times": {
-                "average": avg_response_times,
+                "average": self.avg_response_times,
             },
             "errors": {
-                "total": sum(self.error_counts.values()),
-                "by_endpoint": dict(self.error_counts),
+                "total": int(self._err[:n].sum()),
+                "by_endpoint": self.error_counts,
             },
         }
         
         # Reset counters for next collection period
-        self.request_counts = {k: 0 for k in self.request_counts}
-        self.response_times = {k: [] for k in self.response_times}
-        self.error_counts = {k: 0 for k in self.error_counts}
+        self._req[:n] = 0
+        self._err[:n] = 0
+        self._rt_sum[:n] = 0.0
+        self._rt_n[:n] = 0
         self.last_collection_time = current_time
         
         return metrics
     
     def record_request(self, endpoint: str):
         """Record an API request"""
-        if endpoint not in self.request_counts:
-            self.request_counts[endpoint] = 0
-            self.response_times[endpoint] = []
-            self.error_counts[endpoint] = 0
-        
-        self.request_counts[endpoint] += 1
+        self._req[self._id(endpoint)] += 1
     
     def record_response_time(self, endpoint: str, response_time: float):
         """Record API response time"""
-        if endpoint not in self.response_times:
-            self.response_times[endpoint] = []
-        
-        self.response_times[endpoint].append(response_time)
+        i = self._id(endpoint)
+        self._rt_sum[i] += response_time
+        self._rt_n[i] += 1
     
     def record_error(self, endpoint: str):
         """Record an API error"""
-        if endpoint not in self.error_counts:
-            self.error_counts[endpoint] = 0
-        
-        self.error_counts[endpoint] += 1
+        self._err[self._id(endpoint)] += 1
     
     def collect_all_metrics(self) -> Dict[str, Any]:
         """Collect all metrics (system and application)"""
@@ -140,8 +175,8 @@ class MetricsCollector:
         timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
         filename = self.metrics_dir / f"metrics-{timestamp}.json"
         
-        with open(filename, "w") as f:
-            json.dump(metrics, f, indent=2)
+        with open(filename, "wb") as f:
+            f.write(orjson.dumps(metrics, option=orjson.OPT_SERIALIZE_NUMPY))
 
 
 class AdvancedMetricsCollector(MetricsCollector):
@@ -297,8 +332,8 @@ class AdvancedMetricsCollector(MetricsCollector):
         metrics_file = self.metrics_dir / f"metrics_{timestamp}.json"
         
         try:
-            with open(metrics_file, 'w') as f:
-                json.dump(metrics, f, indent=2, default=str)
+            with open(metrics_file, 'wb') as f:
+                f.write(orjson.dumps(metrics, default=str, option=orjson.OPT_SERIALIZE_NUMPY))
         except Exception as e:
             logger.error(f"Failed to store metrics: {e}")
     
@@ -312,7 +347,7 @@ class AdvancedMetricsCollector(MetricsCollector):
         """Get CPU usage trend over time"""
         # This would typically come from historical data
         # For now, return a simple trend
-        return [psutil.cpu_percent(interval=1)]
+        return [cpu_sampler.get()]
     
     def _calculate_user_retention(self) -> float:
         """Calculate user retention rate"""
@@ -2,10 +2,12 @@
 
 import time
 import functools
+import itertools
 import threading
-from typing import Dict, Any, Optional, Callable, Union
+from typing import Dict, Any, List, Optional, Callable, Hashable, Union
 from datetime import datetime, timedelta
 import psutil
+import numpy as np
 import gc
 import weakref
 from collections import OrderedDict
@@ -70,7 +72,7 @@ class LRUCache:
         self.cache = OrderedDict()
         self.lock = threading.Lock()
     
-    def get(self, key: str) -> Optional[Any]:
+    def get(self, key: Hashable) -> Optional[Any]:
         """Get value from cache"""
         with self.lock:
             if key in self.cache:
@@ -80,7 +82,7 @@ class LRUCache:
                 return value
             return None
     
-    def put(self, key: str, value: Any):
+    def put(self, key: Hashable, value: Any):
         """Put value in cache"""
         with self.lock:
             if key in self.cache:
@@ -92,36 +94,198 @@ class LRUCache:
             
             self.cache[key] = value
 
+class PerformanceRecorder:
+    """Ring buffer of operation durations with periodic summary logging"""
+    
+    def __init__(self, capacity: int = 4096, report_interval: float = 60.0):
+        self.capacity = capacity
+        self.report_interval = report_interval
+        # Each row is (operation id, duration in nanoseconds)
+        self._ring = np.zeros((capacity, 2), dtype=np.int64)
+        self._op_ids: Dict[str, int] = {}
+        self._op_names: List[str] = []
+        self._sequence = itertools.count()
+        self._head = 0
+        self._last_reported = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.running = False
+        self.report_thread = None
+    
+    def _op_id(self, name: str) -> int:
+        """Get the id for an operation name, assigning one if needed"""
+        op_id = self._op_ids.get(name)
+        if op_id is None:
+            with self._lock:
+                op_id = self._op_ids.get(name)
+                if op_id is None:
+                    op_id = len(self._op_names)
+                    self._op_names.append(name)
+                    self._op_ids[name] = op_id
+        return op_id
+    
+    def record(self, name: str, duration_ns: int):
+        """Record a single operation duration"""
+        op_id = self._op_id(name)
+        seq = next(self._sequence)
+        row = self._ring[seq % self.capacity]
+        row[0] = op_id
+        row[1] = duration_ns
+        self._head = seq + 1
+        if not self.running:
+            self.start()
+    
+    def summary(self, since_last_report: bool = False) -> Dict[str, Dict[str, float]]:
+        """Get count and latency percentiles (ms) per operation from the buffered samples"""
+        head = self._head
+        start = self._last_reported if since_last_report else 0
+        count = min(head - start, self.capacity)
+        if count <= 0:
+            return {}
+        
+        samples = self._ring[np.arange(head - count, head) % self.capacity]
+        stats = {}
+        for op_id, name in enumerate(list(self._op_names)):
+            durations = samples[samples[:, 0] == op_id, 1]
+            if durations.size == 0:
+                continue
+            p50, p95 = np.percentile(durations, [50, 95]) / 1e6
+            stats[name] = {
+                'count': int(durations.size),
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'max_ms': float(durations.max() / 1e6),
+            }
+        return stats
+    
+    def report(self):
+        """Log one summary line per operation recorded since the last report"""
+        head = self._head
+        stats = self.summary(since_last_report=True)
+        self._last_reported = head
+        for name, op_stats in stats.items():
+            logger.info(
+                f"Operation {name}: {op_stats['count']} calls, "
+                f"p50 {op_stats['p50_ms']:.3f}ms, p95 {op_stats['p95_ms']:.3f}ms, "
+                f"max {op_stats['max_ms']:.3f}ms"
+            )
+    
+    def report_loop(self):
+        """Background loop emitting periodic summaries"""
+        while not self._stop_event.wait(self.report_interval):
+            try:
+                self.report()
+            except Exception as e:
+                logger.error(f"Error reporting performance summary: {e}")
+    
+    def start(self):
+        """Start the background reporting thread"""
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            self._stop_event.clear()
+            self.report_thread = threading.Thread(target=self.report_loop)
+            self.report_thread.daemon = True
+            self.report_thread.start()
+    
+    def stop(self):
+        """Stop the background reporting thread and flush a final summary"""
+        if self.running:
+            self.running = False
+            self._stop_event.set()
+            if self.report_thread:
+                self.report_thread.join(timeout=5.0)
+            self.report()
+
+class CPUSampler:
+    """Background sampler publishing the latest CPU usage percentage"""
+    
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._last_cpu: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self.running = False
+        self.sampler_thread = None
+    
+    def sample_loop(self):
+        """Sample CPU usage once per interval until stopped"""
+        # The first non-blocking call only establishes the baseline
+        psutil.cpu_percent(interval=None)
+        while not self._stop_event.wait(self.interval):
+            self._last_cpu = psutil.cpu_percent(interval=None)
+    
+    def get(self) -> float:
+        """Get the most recent CPU usage percentage without blocking"""
+        if not self.running:
+            self.start()
+        if self._last_cpu is None:
+            # No full interval sampled yet
+            return psutil.cpu_percent(interval=None)
+        return self._last_cpu
+    
+    def start(self):
+        """Start the background sampling thread"""
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            self._stop_event.clear()
+            self.sampler_thread = threading.Thread(target=self.sample_loop)
+            self.sampler_thread.daemon = True
+            self.sampler_thread.start()
+    
+    def stop(self):
+        """Stop the background sampling thread"""
+        if self.running:
+            self.running = False
+            self._stop_event.set()
+            if self.sampler_thread:
+                self.sampler_thread.join(timeout=5.0)
+
 # Global instances
 performance_optimizer = PerformanceOptimizer()
 lru_cache = LRUCache(max_size=1000)
+performance_recorder = PerformanceRecorder()
+cpu_sampler = CPUSampler()
 
 # Decorators for performance tracking
 def track_performance(operation_name: str = None):
     """Decorator to track function performance"""
     def decorator(func):
+        name = operation_name or func.__name__
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_ns = time.perf_counter_ns()
             try:
                 result = func(*args, **kwargs)
-                duration = time.time() - start_time
-                logger.info(f"Operation {operation_name or func.__name__} completed in {duration:.3f}s")
-                return result
             except Exception as e:
-                duration = time.time() - start_time
-                logger.error(f"Operation {operation_name or func.__name__} failed after {duration:.3f}s: {e}")
+                duration_ns = time.perf_counter_ns() - start_ns
+                logger.error(f"Operation {name} failed after {duration_ns / 1e9:.3f}s: {e}")
                 raise
+            # Successful calls are summarized periodically rather than logged individually
+            performance_recorder.record(name, time.perf_counter_ns() - start_ns)
+            return result
         return wrapper
     return decorator
 
+def _make_cache_key(func: Callable, args: tuple, kwargs: dict):
+    """Build a cache key for a call, falling back to a string key for unhashable arguments"""
+    key = (func, args, tuple(sorted(kwargs.items()))) if kwargs else (func, args)
+    try:
+        hash(key)
+    except TypeError:
+        return f"{func.__qualname__}:{hash(str(args) + str(sorted(kwargs.items())))}"
+    return key
+
 def cache_result(ttl: int = 300):
     """Decorator to cache function results"""
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # Create cache key from function name and arguments
-            cache_key = f"{func.__name__}:{hash(str(args) + str(sorted(kwargs.items())))}"
+            cache_key = _make_cache_key(func, args, kwargs)
             
             # Try to get from cache
             cached_result = lru_cache.get(cache_key)
@@ -149,7 +313,7 @@ def get_memory_usage() -> Dict[str, float]:
 
 def get_cpu_usage() -> float:
     """Get current CPU usage percentage"""
-    return psutil.cpu_percent(interval=1)
+    return cpu_sampler.get()
 
 def optimize_system():
     """Run system optimization"""
@@ -2,130 +2,270 @@
 
 import os
 import time
-from typing import Dict, Any, Optional
+import logging
+import functools
+import threading
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Tuple
 from prometheus_client import Counter, Histogram, Gauge, Summary, start_http_server
 
-# Define Prometheus metrics
-REQUEST_COUNT = Counter(
-    'credtech_api_requests_total',
-    'Total number of requests by endpoint and status',
-    ['endpoint', 'status']
-)
-
-REQUEST_LATENCY = Histogram(
-    'credtech_api_request_latency_seconds',
-    'Request latency in seconds by endpoint',
-    ['endpoint'],
-    buckets=(0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
-)
-
-ERROR_COUNT = Counter(
-    'credtech_api_errors_total',
-    'Total number of errors by endpoint',
-    ['endpoint']
-)
-
-SYSTEM_CPU_USAGE = Gauge(
-    'credtech_system_cpu_usage',
-    'Current CPU usage percentage'
-)
-
-SYSTEM_MEMORY_USAGE = Gauge(
-    'credtech_system_memory_usage_bytes',
-    'Current memory usage in bytes'
-)
-
-SYSTEM_MEMORY_TOTAL = Gauge(
-    'credtech_system_memory_total_bytes',
-    'Total system memory in bytes'
-)
-
-SYSTEM_DISK_USAGE = Gauge(
-    'credtech_system_disk_usage_bytes',
-    'Current disk usage in bytes'
-)
-
-SYSTEM_DISK_TOTAL = Gauge(
-    'credtech_system_disk_total_bytes',
-    'Total disk space in bytes'
-)
-
-API_UPTIME = Gauge(
-    'credtech_api_uptime_seconds',
-    'API uptime in seconds'
-)
-
-MODEL_PREDICTION_LATENCY = Histogram(
-    'credtech_model_prediction_latency_seconds',
-    'Model prediction latency in seconds',
-    ['model_version'],
-    buckets=(0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0)
-)
-
-MODEL_PREDICTION_COUNT = Counter(
-    'credtech_model_predictions_total',
-    'Total number of model predictions',
-    ['model_version']
-)
+logger = logging.getLogger(__name__)
+
+# Metrics are only recorded when the exporter is configured or explicitly started
+_enabled = os.environ.get('PROMETHEUS_PORT') is not None
+
+# Request latency histogram buckets (seconds)
+REQUEST_LATENCY_BUCKETS = (0.025, 0.1, 0.25, 1.0, 2.5, 10.0)
+
+# Prometheus metric definitions, instantiated on first use
+_METRIC_FACTORIES = {
+    'REQUEST_COUNT': lambda: Counter(
+        'credtech_api_requests_total',
+        'Total number of requests by endpoint and status',
+        ['endpoint', 'status']
+    ),
+    'REQUEST_LATENCY': lambda: Histogram(
+        'credtech_api_request_latency_seconds',
+        'Request latency in seconds by endpoint',
+        ['endpoint'],
+        # Kept to the thresholds dashboards and alerts use; fewer buckets per observe()
+        buckets=REQUEST_LATENCY_BUCKETS
+    ),
+    'ERROR_COUNT': lambda: Counter(
+        'credtech_api_errors_total',
+        'Total number of errors by endpoint',
+        ['endpoint']
+    ),
+    'SYSTEM_CPU_USAGE': lambda: Gauge(
+        'credtech_system_cpu_usage',
+        'Current CPU usage percentage'
+    ),
+    'SYSTEM_MEMORY_USAGE': lambda: Gauge(
+        'credtech_system_memory_usage_bytes',
+        'Current memory usage in bytes'
+    ),
+    'SYSTEM_MEMORY_TOTAL': lambda: Gauge(
+        'credtech_system_memory_total_bytes',
+        'Total system memory in bytes'
+    ),
+    'SYSTEM_DISK_USAGE': lambda: Gauge(
+        'credtech_system_disk_usage_bytes',
+        'Current disk usage in bytes'
+    ),
+    'SYSTEM_DISK_TOTAL': lambda: Gauge(
+        'credtech_system_disk_total_bytes',
+        'Total disk space in bytes'
+    ),
+    'API_UPTIME': lambda: Gauge(
+        'credtech_api_uptime_seconds',
+        'API uptime in seconds'
+    ),
+    'MODEL_PREDICTION_LATENCY': lambda: Histogram(
+        'credtech_model_prediction_latency_seconds',
+        'Model prediction latency in seconds',
+        ['model_version'],
+        buckets=(0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0)
+    ),
+    'MODEL_PREDICTION_COUNT': lambda: Counter(
+        'credtech_model_predictions_total',
+        'Total number of model predictions',
+        ['model_version']
+    ),
+}
+
+_metrics: Dict[str, Any] = {}
+_metrics_lock = threading.Lock()
+
+
+def _metric(name: str):
+    """Get a Prometheus metric by name, creating it on first use"""
+    metric = _metrics.get(name)
+    if metric is None:
+        with _metrics_lock:
+            metric = _metrics.get(name)
+            if metric is None:
+                metric = _metrics[name] = _METRIC_FACTORIES[name]()
+    return metric
+
+
+def __getattr__(name: str):
+    """Expose metrics such as REQUEST_COUNT as lazily created module attributes"""
+    if name in _METRIC_FACTORIES:
+        return _metric(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def is_enabled() -> bool:
+    """Check whether metrics are being recorded"""
+    return _enabled
+
+
+# Interval between flushes of batched counter/histogram updates (seconds)
+FLUSH_INTERVAL = 0.25
+
+# Pending updates, aggregated per label tuple and applied in bulk by flush_metrics()
+_pending_lock = threading.Lock()
+_pending_requests: Dict[Tuple[str, str], int] = defaultdict(int)
+_pending_errors: Dict[str, int] = defaultdict(int)
+_pending_predictions: Dict[str, int] = defaultdict(int)
+_pending_latencies: List[Tuple[str, float]] = []
+_pending_prediction_latencies: List[Tuple[str, float]] = []
+_flush_thread: Optional[threading.Thread] = None
+
+
+# Cached labelled children so hot paths skip the per-call label resolution
+@functools.lru_cache(maxsize=1024)
+def _request_count_child(endpoint: str, status: str):
+    return _metric('REQUEST_COUNT').labels(endpoint=endpoint, status=status)
+
+
+@functools.lru_cache(maxsize=1024)
+def _request_latency_child(endpoint: str):
+    return _metric('REQUEST_LATENCY').labels(endpoint=endpoint)
+
+
+@functools.lru_cache(maxsize=1024)
+def _error_count_child(endpoint: str):
+    return _metric('ERROR_COUNT').labels(endpoint=endpoint)
+
+
+@functools.lru_cache(maxsize=1024)
+def _prediction_count_child(model_version: str):
+    return _metric('MODEL_PREDICTION_COUNT').labels(model_version=model_version)
+
+
+@functools.lru_cache(maxsize=1024)
+def _prediction_latency_child(model_version: str):
+    return _metric('MODEL_PREDICTION_LATENCY').labels(model_version=model_version)
+
+
+def flush_metrics():
+    """Apply all pending batched updates to the Prometheus metrics"""
+    global _pending_requests, _pending_errors, _pending_predictions
+    global _pending_latencies, _pending_prediction_latencies
+    
+    with _pending_lock:
+        requests, _pending_requests = _pending_requests, defaultdict(int)
+        errors, _pending_errors = _pending_errors, defaultdict(int)
+        predictions, _pending_predictions = _pending_predictions, defaultdict(int)
+        latencies, _pending_latencies = _pending_latencies, []
+        prediction_latencies, _pending_prediction_latencies = _pending_prediction_latencies, []
+    
+    for (endpoint, status), count in requests.items():
+        _request_count_child(endpoint, status).inc(count)
+    for endpoint, count in errors.items():
+        _error_count_child(endpoint).inc(count)
+    for model_version, count in predictions.items():
+        _prediction_count_child(model_version).inc(count)
+    for endpoint, latency in latencies:
+        _request_latency_child(endpoint).observe(latency)
+    for model_version, latency in prediction_latencies:
+        _prediction_latency_child(model_version).observe(latency)
+
+
+def _flush_loop():
+    """Background loop flushing batched metric updates"""
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        try:
+            flush_metrics()
+        except Exception as e:
+            logger.error(f"Error flushing Prometheus metrics: {e}")
+
+
+def _ensure_flush_thread():
+    """Start the background flush thread if it is not running yet"""
+    global _flush_thread
+    if _flush_thread is None:
+        with _pending_lock:
+            if _flush_thread is None:
+                _flush_thread = threading.Thread(target=_flush_loop, daemon=True)
+                _flush_thread.start()
 
 
 def record_request_metric(endpoint: str, status_code: int):
     """Record a request metric"""
-    REQUEST_COUNT.labels(endpoint=endpoint, status=str(status_code)).inc()
+    if not _enabled:
+        return
+    _ensure_flush_thread()
+    with _pending_lock:
+        _pending_requests[(endpoint, str(status_code))] += 1
 
 
 def record_latency_metric(endpoint: str, latency: float):
     """Record a latency metric"""
-    REQUEST_LATENCY.labels(endpoint=endpoint).observe(latency)
+    if not _enabled:
+        return
+    _ensure_flush_thread()
+    with _pending_lock:
+        _pending_latencies.append((endpoint, latency))
 
 
 def record_error_metric(endpoint: str):
     """Record an error metric"""
-    ERROR_COUNT.labels(endpoint=endpoint).inc()
+    if not _enabled:
+        return
+    _ensure_flush_thread()
+    with _pending_lock:
+        _pending_errors[endpoint] += 1
 
 
 def record_system_metrics(cpu_percent: float, memory_used: int, memory_total: int, 
                          disk_used: int, disk_total: int):
     """Record system metrics"""
-    SYSTEM_CPU_USAGE.set(cpu_percent)
-    SYSTEM_MEMORY_USAGE.set(memory_used)
-    SYSTEM_MEMORY_TOTAL.set(memory_total)
-    SYSTEM_DISK_USAGE.set(disk_used)
-    SYSTEM_DISK_TOTAL.set(disk_total)
+    if not _enabled:
+        return
+    _metric('SYSTEM_CPU_USAGE').set(cpu_percent)
+    _metric('SYSTEM_MEMORY_USAGE').set(memory_used)
+    _metric('SYSTEM_MEMORY_TOTAL').set(memory_total)
+    _metric('SYSTEM_DISK_USAGE').set(disk_used)
+    _metric('SYSTEM_DISK_TOTAL').set(disk_total)
 
 
 def record_uptime(uptime_seconds: float):
     """Record API uptime"""
-    API_UPTIME.set(uptime_seconds)
+    if not _enabled:
+        return
+    _metric('API_UPTIME').set(uptime_seconds)
 
 
 def record_model_prediction(model_version: str, latency: float):
     """Record a model prediction metric"""
-    MODEL_PREDICTION_LATENCY.labels(model_version=model_version).observe(latency)
-    MODEL_PREDICTION_COUNT.labels(model_version=model_version).inc()
+    if not _enabled:
+        return
+    _ensure_flush_thread()
+    with _pending_lock:
+        _pending_prediction_latencies.append((model_version, latency))
+        _pending_predictions[model_version] += 1
 
 
 def start_prometheus_server(port: int = 9090):
     """Start the Prometheus metrics server"""
+    global _enabled
+    
     # Get port from environment variable if available
     prometheus_port = int(os.environ.get('PROMETHEUS_PORT', port))
     
+    # Serving metrics implies recording them
+    _enabled = True
+    init_metrics()
+    
     # Start the server
     start_http_server(prometheus_port)
     print(f"Prometheus metrics server started on port {prometheus_port}")
 
 
-# Initialize metrics on import
 def init_metrics():
     """Initialize metrics with default values"""
     # Set initial values for gauges
-    SYSTEM_CPU_USAGE.set(0)
-    SYSTEM_MEMORY_USAGE.set(0)
-    SYSTEM_MEMORY_TOTAL.set(0)
-    SYSTEM_DISK_USAGE.set(0)
-    SYSTEM_DISK_TOTAL.set(0)
-    API_UPTIME.set(0)
+    _metric('SYSTEM_CPU_USAGE').set(0)
+    _metric('SYSTEM_MEMORY_USAGE').set(0)
+    _metric('SYSTEM_MEMORY_TOTAL').set(0)
+    _metric('SYSTEM_DISK_USAGE').set(0)
+    _metric('SYSTEM_DISK_TOTAL').set(0)
+    _metric('API_UPTIME').set(0)
 
 
-# Initialize metrics
-init_metrics()
\ No newline at end of file
+# Initialize metrics up front only when the exporter is configured
+if _enabled:
+    init_metrics()
@@ -1,14 +1,17 @@
 """Secure data handling utilities for CredTech XScore"""
 
 import os
-import json
+import atexit
 import base64
 import hashlib
+import hmac
 import secrets
-from typing import Dict, Any, Optional, Union
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+import functools
+import threading
+from typing import Dict, Any, List, Optional, Tuple, Union
+import orjson
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 from src.utils.logging import get_app_logger
 from src.utils.error_handling import DataError
@@ -19,19 +22,120 @@ logger = get_app_logger(__name__)
 # Environment variable for encryption key
 ENV_KEY_NAME = "CREDTECH_ENCRYPTION_KEY"
 
+# Leading byte of binary AES-GCM files written by secure_save_json; JSON never starts with it
+AEAD_FORMAT_VERSION = b'\x01'
+AEAD_NONCE_SIZE = 12
+
+# Directories already created by secure_save_json, to skip repeated makedirs calls
+_ENSURED_DIRS = set()
+_ENSURED_DIRS_LOCK = threading.Lock()
+
+def _ensure_dir(directory: str) -> None:
+    """Create a directory once per process"""
+    if not directory or directory in _ENSURED_DIRS:
+        return
+    with _ENSURED_DIRS_LOCK:
+        if directory not in _ENSURED_DIRS:
+            os.makedirs(directory, exist_ok=True)
+            _ENSURED_DIRS.add(directory)
+
+# Every FSYNC_BATCH_SIZE-th write by _write_atomic is fsynced before it
+# replaces its target; files written since the previous sync are flushed at
+# the same point, and whatever is left over at interpreter exit
+FSYNC_BATCH_SIZE = 16
+_unsynced_writes = 0
+_UNSYNCED_PATHS = set()
+_UNSYNCED_PATHS_LOCK = threading.Lock()
+
+def _fsync_dir(directory: str) -> None:
+    """Flush a directory entry so a completed os.replace survives a crash"""
+    try:
+        fd = os.open(directory or '.', os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened on some platforms (e.g. Windows)
+        return
+    try:
+        os.fsync(fd)
+    except OSError as e:
+        logger.warning(f"Could not fsync directory {directory}: {str(e)}")
+    finally:
+        os.close(fd)
+
+def _fsync_paths(paths: List[str]) -> None:
+    """Flush the given files and their directories, ignoring files that are gone"""
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.warning(f"Could not fsync {path}: {str(e)}")
+    for directory in {os.path.dirname(path) for path in paths}:
+        _fsync_dir(directory)
+
+def sync_saved_files() -> None:
+    """fsync every file written by _write_atomic since the last synced write"""
+    global _unsynced_writes
+    with _UNSYNCED_PATHS_LOCK:
+        paths = list(_UNSYNCED_PATHS)
+        _UNSYNCED_PATHS.clear()
+        _unsynced_writes = 0
+    _fsync_paths(paths)
+
+atexit.register(sync_saved_files)
+
+def _write_atomic(file_path: str, payload: bytes) -> None:
+    """Replace file_path with payload so readers never see a partial file"""
+    global _unsynced_writes
+    with _UNSYNCED_PATHS_LOCK:
+        _unsynced_writes += 1
+        sync_now = _unsynced_writes >= FSYNC_BATCH_SIZE
+        if sync_now:
+            pending = [path for path in _UNSYNCED_PATHS if path != file_path]
+            _UNSYNCED_PATHS.clear()
+            _unsynced_writes = 0
+        else:
+            _UNSYNCED_PATHS.add(file_path)
+    
+    tmp_path = f"{file_path}.{secrets.token_hex(4)}.tmp"
+    try:
+        with open(tmp_path, 'wb', buffering=1 << 16) as f:
+            f.write(payload)
+            if sync_now:
+                # Data must be on disk before the rename makes it visible
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    
+    if sync_now:
+        _fsync_dir(os.path.dirname(file_path))
+        _fsync_paths(pending)
+
+@functools.lru_cache(maxsize=1)
 def get_encryption_key() -> bytes:
     """Get or generate encryption key
     
+    The key is resolved once per process, so a generated key stays stable
+    for the lifetime of the process.
+    
     Returns:
-        bytes: Encryption key
+        bytes: URL-safe base64 encoded 32-byte key, as expected by Fernet
     """
     # Try to get key from environment variable
     env_key = os.environ.get(ENV_KEY_NAME)
     
     if env_key:
         try:
-            # Decode the base64 encoded key
-            return base64.urlsafe_b64decode(env_key)
+            # Validate the base64 encoded key
+            if len(base64.urlsafe_b64decode(env_key)) == 32:
+                return env_key.encode('utf-8')
+            logger.error("Encryption key must decode to 32 bytes")
         except Exception as e:
             logger.error(f"Error decoding encryption key: {str(e)}")
     
@@ -47,6 +151,7 @@ def get_encryption_key() -> bytes:
     
     return key
 
+@functools.lru_cache(maxsize=1)
 def get_cipher() -> Fernet:
     """Get Fernet cipher for encryption/decryption
     
@@ -56,6 +161,42 @@ def get_cipher() -> Fernet:
     key = get_encryption_key()
     return Fernet(key)
 
+@functools.lru_cache(maxsize=1)
+def get_aead() -> AESGCM:
+    """Get AES-256-GCM cipher for binary bulk encryption
+    
+    The AES key is derived from the configured encryption key so the same
+    secret is never used directly by two different ciphers.
+    
+    Returns:
+        AESGCM: Cipher for encryption/decryption
+    """
+    master_key = base64.urlsafe_b64decode(get_encryption_key())
+    aead_key = hmac.new(master_key, b'credtech-aes-256-gcm', hashlib.sha256).digest()
+    return AESGCM(aead_key)
+
+def encrypt_bytes(data: bytes) -> bytes:
+    """Encrypt raw bytes
+    
+    Args:
+        data: Bytes to encrypt
+    
+    Returns:
+        bytes: Fernet token, which is already URL-safe base64
+    """
+    return get_cipher().encrypt(data)
+
+def decrypt_bytes(token: bytes) -> bytes:
+    """Decrypt a Fernet token produced by encrypt_bytes
+    
+    Args:
+        token: Fernet token
+    
+    Returns:
+        bytes: Decrypted bytes
+    """
+    return get_cipher().decrypt(token)
+
 def encrypt_data(data: Union[str, bytes, Dict, list]) -> str:
     """Encrypt data
     
@@ -63,24 +204,22 @@ def encrypt_data(data: Union[str, bytes, Dict, list]) -> str:
         data: Data to encrypt (string, bytes, dict, or list)
     
     Returns:
-        str: Base64 encoded encrypted data
+        str: Encrypted data as a URL-safe base64 Fernet token
     """
     try:
-        # Convert data to JSON string if it's a dict or list
-        if isinstance(data, (dict, list)):
-            data = json.dumps(data)
-        
-        # Convert to bytes if it's a string
-        if isinstance(data, str):
-            data = data.encode('utf-8')
-        
-        # Encrypt the data
-        cipher = get_cipher()
-        encrypted_data = cipher.encrypt(data)
+        # Bytes go straight to the cipher; everything else is converted first
+        if type(data) is not bytes:
+            # Serialize dicts and lists straight to JSON bytes
+            if isinstance(data, (dict, list)):
+                data = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+            
+            # Convert to bytes if it's a string
+            elif isinstance(data, str):
+                data = data.encode('utf-8')
         
-        # Return base64 encoded encrypted data
-        return base64.urlsafe_b64encode(encrypted_data).decode('utf-8')
-    except Exception as e:
+        # Encrypt the data; the token is already URL-safe base64
+        return encrypt_bytes(data).decode('ascii')
+    except (TypeError, ValueError) as e:
         logger.error(f"Error encrypting data: {str(e)}")
         raise DataError(f"Failed to encrypt data: {str(e)}")
 
@@ -88,32 +227,44 @@ def decrypt_data(encrypted_data: str) -> Union[str, Dict, list]:
     """Decrypt data
     
     Args:
-        encrypted_data: Base64 encoded encrypted data
+        encrypted_data: Fernet token as returned by encrypt_data
     
     Returns:
         Union[str, Dict, list]: Decrypted data
     """
     try:
-        # Decode base64
-        encrypted_bytes = base64.urlsafe_b64decode(encrypted_data)
+        token = encrypted_data.encode('ascii')
         
-        # Decrypt the data
-        cipher = get_cipher()
-        decrypted_bytes = cipher.decrypt(encrypted_bytes)
+        # Fernet tokens start with 'g' (version byte 0x80); older data
+        # was additionally wrapped in a second base64 layer
+        if not token.startswith(b'g'):
+            token = base64.urlsafe_b64decode(token)
         
-        # Convert to string
-        decrypted_str = decrypted_bytes.decode('utf-8')
+        # Decrypt the data
+        decrypted_bytes = decrypt_bytes(token)
         
-        # Try to parse as JSON
+        # Try to parse the bytes as JSON
         try:
-            return json.loads(decrypted_str)
-        except json.JSONDecodeError:
+            return orjson.loads(decrypted_bytes)
+        except orjson.JSONDecodeError:
             # If not valid JSON, return as string
-            return decrypted_str
-    except Exception as e:
+            return decrypted_bytes.decode('utf-8')
+    except (InvalidToken, AttributeError, TypeError, ValueError) as e:
         logger.error(f"Error decrypting data: {str(e)}")
         raise DataError(f"Failed to decrypt data: {str(e)}")
 
+def _blake2b_hash(data: str, salt: str) -> str:
+    """Hash data with BLAKE2b keyed by the salt in a single native call"""
+    salt_bytes = salt.encode('utf-8')
+    if len(salt_bytes) > 64:
+        # BLAKE2b keys are limited to 64 bytes
+        salt_bytes = hashlib.blake2b(salt_bytes).digest()
+    return hashlib.blake2b(data.encode('utf-8'), key=salt_bytes, digest_size=32).hexdigest()
+
+def _sha256_hash(data: str, salt: str) -> str:
+    """Hash data with salted SHA-256 (legacy format)"""
+    return hashlib.sha256((salt + data).encode('utf-8')).hexdigest()
+
 def secure_hash(data: str, salt: Optional[str] = None) -> Dict[str, str]:
     """Create a secure hash of data with salt
     
@@ -122,25 +273,24 @@ def secure_hash(data: str, salt: Optional[str] = None) -> Dict[str, str]:
         salt: Optional salt, generated if not provided
     
     Returns:
-        Dict[str, str]: Dictionary with hash and salt
+        Dict[str, str]: Dictionary with hash, salt and algorithm
     """
     if salt is None:
         salt = secrets.token_hex(16)
     
-    # Create hash
-    hash_obj = hashlib.sha256()
-    hash_obj.update(salt.encode('utf-8'))
-    hash_obj.update(data.encode('utf-8'))
-    hash_value = hash_obj.hexdigest()
-    
     return {
-        'hash': hash_value,
-        'salt': salt
+        'hash': _blake2b_hash(data, salt),
+        'salt': salt,
+        'algorithm': 'blake2b'
     }
 
 def verify_hash(data: str, hash_dict: Dict[str, str]) -> bool:
     """Verify data against a hash
     
+    Hashes without an 'algorithm' entry are legacy salted SHA-256 hashes.
+    The digests are compared in constant time, so callers can rely on the
+    comparison not leaking how much of the hash matched.
+    
     Args:
         data: Data to verify
         hash_dict: Dictionary with hash and salt
@@ -155,42 +305,102 @@ def verify_hash(data: str, hash_dict: Dict[str, str]) -> bool:
     if not stored_hash or not salt:
         return False
     
-    # Create hash with the same salt
-    hash_obj = hashlib.sha256()
-    hash_obj.update(salt.encode('utf-8'))
-    hash_obj.update(data.encode('utf-8'))
-    calculated_hash = hash_obj.hexdigest()
+    # Create hash with the same salt and algorithm
+    if hash_dict.get('algorithm') == 'blake2b':
+        calculated_hash = _blake2b_hash(data, salt)
+    else:
+        calculated_hash = _sha256_hash(data, salt)
     
     # Compare hashes
     return secrets.compare_digest(calculated_hash, stored_hash)
 
-def secure_save_json(data: Dict[str, Any], file_path: str, encrypt: bool = True) -> None:
+def _serialize_for_save(data: Dict[str, Any], encrypt: bool, binary: bool) -> bytes:
+    """Serialize data to the on-disk representation used by secure_save_json"""
+    if encrypt and binary:
+        # Version byte, nonce and ciphertext with no text encoding
+        plaintext = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        nonce = secrets.token_bytes(AEAD_NONCE_SIZE)
+        return AEAD_FORMAT_VERSION + nonce + get_aead().encrypt(nonce, plaintext, None)
+    if encrypt:
+        return orjson.dumps({'encrypted': True, 'data': encrypt_data(data)})
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+def secure_save_json(data: Dict[str, Any], file_path: str, encrypt: bool = True, binary: bool = False) -> None:
     """Save data to a JSON file with optional encryption
     
     Args:
         data: Data to save
         file_path: Path to save the file
         encrypt: Whether to encrypt the data
+        binary: Write encrypted data as raw AES-GCM bytes instead of a
+            base64 Fernet token wrapped in JSON; preferable for large data
+    
+    The file is replaced atomically via a temporary file and os.replace,
+    so readers never see a partial file. Durability is batched: every
+    FSYNC_BATCH_SIZE-th write is fsynced before the replace, together with
+    the files written since the previous one (see sync_saved_files), so a
+    crash may lose or, depending on the filesystem, empty the most recent
+    unsynced saves.
     """
     try:
         # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        _ensure_dir(os.path.dirname(file_path))
         
-        if encrypt:
-            # Encrypt the data
-            encrypted_data = encrypt_data(data)
-            
-            # Save encrypted data
-            with open(file_path, 'w') as f:
-                json.dump({'encrypted': True, 'data': encrypted_data}, f)
-        else:
-            # Save unencrypted data
-            with open(file_path, 'w') as f:
-                json.dump(data, f, indent=2)
+        payload = _serialize_for_save(data, encrypt, binary)
+        _write_atomic(file_path, payload)
     except Exception as e:
         logger.error(f"Error saving data to {file_path}: {str(e)}")
         raise DataError(f"Failed to save data: {str(e)}")
 
+def secure_save_many(items: List[Tuple[str, Dict[str, Any]]], encrypt: bool = True, binary: bool = False) -> None:
+    """Save many records, each to its own file, with one durable commit
+    
+    Every payload is written to a temporary file first, the temporary files
+    are fsynced in a single pass, and only then is each moved into place
+    with os.replace and each affected directory fsynced once. Unlike
+    secure_save_json, every file is on disk when this returns; if any write
+    fails before the replace step, no target file is touched.
+    
+    Args:
+        items: (file_path, data) pairs to save
+        encrypt: Whether to encrypt the data
+        binary: Write encrypted data as raw AES-GCM bytes (see secure_save_json)
+    """
+    file_path = None
+    tmp_paths = []
+    replaced = 0
+    try:
+        payloads = [(path, _serialize_for_save(data, encrypt, binary)) for path, data in items]
+        
+        # Write every temporary file before syncing any of them
+        for file_path, payload in payloads:
+            _ensure_dir(os.path.dirname(file_path))
+            tmp_path = f"{file_path}.{secrets.token_hex(4)}.tmp"
+            tmp_paths.append(tmp_path)
+            with open(tmp_path, 'wb', buffering=1 << 16) as f:
+                f.write(payload)
+        
+        # Data must be on disk before the renames make it visible
+        for tmp_path in tmp_paths:
+            fd = os.open(tmp_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        
+        for tmp_path, (file_path, _) in zip(tmp_paths, payloads):
+            os.replace(tmp_path, file_path)
+            replaced += 1
+        
+        for directory in {os.path.dirname(path) for path, _ in payloads}:
+            _fsync_dir(directory)
+    except Exception as e:
+        for tmp_path in tmp_paths[replaced:]:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        logger.error(f"Error saving batch data (last file {file_path}): {str(e)}")
+        raise DataError(f"Failed to save data: {str(e)}")
+
 def secure_load_json(file_path: str) -> Dict[str, Any]:
     """Load data from a JSON file with automatic decryption if needed
     
@@ -201,14 +411,20 @@ def secure_load_json(file_path: str) -> Dict[str, Any]:
         Dict[str, Any]: Loaded data
     """
     try:
-        # Check if file exists
-        if not os.path.exists(file_path):
+        # Load the whole file in one read; a missing file is not an error
+        try:
+            with open(file_path, 'rb', buffering=0) as f:
+                raw = f.readall()
+        except FileNotFoundError:
             logger.warning(f"File not found: {file_path}")
             return {}
         
-        # Load the file
-        with open(file_path, 'r') as f:
-            file_data = json.load(f)
+        # Binary AES-GCM file
+        if raw[:1] == AEAD_FORMAT_VERSION:
+            nonce = raw[1:1 + AEAD_NONCE_SIZE]
+            return orjson.loads(get_aead().decrypt(nonce, raw[1 + AEAD_NONCE_SIZE:], None))
+        
+        file_data = orjson.loads(raw)
         
         # Check if data is encrypted
         if isinstance(file_data, dict) and file_data.get('encrypted', False):
@@ -229,12 +445,11 @@ def sanitize_sensitive_data(data: Dict[str, Any], sensitive_fields: list) -> Dic
         sensitive_fields: List of sensitive field names
     
     Returns:
-        Dict[str, Any]: Sanitized data
+        Dict[str, Any]: Sanitized data. When no sensitive fields are present
+        the input dict itself is returned, so callers must treat it as read-only.
     """
-    sanitized = data.copy()
-    
-    for field in sensitive_fields:
-        if field in sanitized:
-            sanitized[field] = '********'
+    hits = data.keys() & set(sensitive_fields)
+    if not hits:
+        return data
     
-    return sanitized
\ No newline at end of file
+    return {key: ('********' if key in hits else value) for key, value in data.items()}
@@ -1,11 +1,16 @@
 """Security utilities for CredTech XScore"""
 
+import base64
 import hashlib
+import hmac
+import json
 import secrets
 import time
 import jwt
 import re
-from typing import Dict, Any, Optional, List, Tuple
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 import logging
 from functools import wraps
@@ -13,15 +18,56 @@ import streamlit as st
 
 logger = logging.getLogger(__name__)
 
+# PBKDF2 iteration bounds; hashes without a stored count use the legacy default
+MIN_PBKDF2_ITERATIONS = 100000
+MAX_PBKDF2_ITERATIONS = 1000000
+LEGACY_PBKDF2_ITERATIONS = 100000
+
+# Number of lock stripes guarding per-identifier security state (power of two)
+LOCK_STRIPES = 64
+
+# Precompiled validation patterns
+_RE_UPPER = re.compile(r'[A-Z]')
+_RE_LOWER = re.compile(r'[a-z]')
+_RE_DIGIT = re.compile(r'\d')
+_RE_SPECIAL = re.compile(r'[!@#$%^&*(),.?":{}|<>]')
+_RE_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Characters stripped from user input by SecurityManager.sanitize_input
+_SANITIZE_STRIP_TABLE = str.maketrans('', '', '<>"\'')
+
+# Characters not allowed in filenames (path traversal and shell metacharacters)
+_UNSAFE_FILENAME_CHARS = frozenset('/\\:*?"<>|')
+
+def calibrate_pbkdf2_iterations(target_ms: float, sample_iterations: int = 10000) -> int:
+    """Estimate the PBKDF2-HMAC-SHA256 iteration count that takes about target_ms on this host"""
+    start = time.perf_counter()
+    hashlib.pbkdf2_hmac('sha256', b'calibration', b'calibration-salt', sample_iterations)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if elapsed_ms <= 0:
+        return MAX_PBKDF2_ITERATIONS
+    iterations = int(sample_iterations * target_ms / elapsed_ms)
+    return max(MIN_PBKDF2_ITERATIONS, min(iterations, MAX_PBKDF2_ITERATIONS))
+
+def _b64url_encode(data: bytes) -> bytes:
+    """Base64url-encode without padding, as used in JWT segments"""
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
 class SecurityManager:
     """Central security management for the application"""
     
     def __init__(self):
         self.secret_key = self._generate_secret_key()
         self.jwt_secret = self._generate_jwt_secret()
-        self.rate_limits = {}
+        # HS256 signing state is fixed for the lifetime of the manager
+        self._jwt_key = self.jwt_secret.encode('utf-8')
+        self._jwt_header_segment = _b64url_encode(b'{"alg":"HS256","typ":"JWT"}')
+        self.rate_limits: Dict[str, Deque[float]] = defaultdict(deque)
         self.failed_attempts = {}
-        self.suspicious_activities = []
+        # Per-identifier state is guarded by one of a fixed set of striped locks
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        # Bounded to the most recent 1000 activities
+        self.suspicious_activities: Deque[Dict[str, Any]] = deque(maxlen=1000)
         
         # Security configuration
         self.config = {
@@ -32,8 +78,12 @@ class SecurityManager:
             'require_special_chars': True,
             'max_session_age': 86400,  # 24 hours
             'enable_rate_limiting': True,
-            'max_requests_per_minute': 60
+            'max_requests_per_minute': 60,
+            'password_hash_target_ms': 100
         }
+        
+        # Tune the password hashing cost to this host once at startup
+        self.password_iterations = calibrate_pbkdf2_iterations(self.config['password_hash_target_ms'])
     
     def _generate_secret_key(self) -> str:
         """Generate a secure secret key"""
@@ -44,27 +94,39 @@ class SecurityManager:
         return secrets.token_urlsafe(64)
     
     def hash_password(self, password: str) -> str:
-        """Hash a password using secure hashing"""
+        """Hash a password using secure hashing
+        
+        The result has the form ``iterations$salt$hash`` so the cost can be
+        retuned without invalidating existing hashes.
+        """
         salt = secrets.token_hex(16)
         hash_obj = hashlib.pbkdf2_hmac(
             'sha256', 
             password.encode('utf-8'), 
             salt.encode('utf-8'), 
-            100000
+            self.password_iterations
         )
-        return f"{salt}${hash_obj.hex()}"
+        return f"{self.password_iterations}${salt}${hash_obj.hex()}"
     
     def verify_password(self, password: str, hashed: str) -> bool:
         """Verify a password against its hash"""
         try:
-            salt, hash_value = hashed.split('$')
+            parts = hashed.split('$')
+            if len(parts) == 2:
+                # Legacy salt$hash format
+                iterations = LEGACY_PBKDF2_ITERATIONS
+                salt, hash_value = parts
+            else:
+                iterations, salt, hash_value = int(parts[0]), parts[1], parts[2]
+            expected = bytes.fromhex(hash_value)
             hash_obj = hashlib.pbkdf2_hmac(
                 'sha256', 
                 password.encode('utf-8'), 
                 salt.encode('utf-8'), 
-                100000
+                iterations
             )
-            return hash_obj.hex() == hash_value
+            # Constant-time comparison on the raw digest bytes
+            return hmac.compare_digest(hash_obj, expected)
         except Exception:
             return False
     
@@ -75,16 +137,16 @@ class SecurityManager:
         if len(password) < self.config['password_min_length']:
             errors.append(f"Password must be at least {self.config['password_min_length']} characters long")
         
-        if not re.search(r'[A-Z]', password):
+        if not _RE_UPPER.search(password):
             errors.append("Password must contain at least one uppercase letter")
         
-        if not re.search(r'[a-z]', password):
+        if not _RE_LOWER.search(password):
             errors.append("Password must contain at least one lowercase letter")
         
-        if not re.search(r'\d', password):
+        if not _RE_DIGIT.search(password):
             errors.append("Password must contain at least one number")
         
-        if self.config['require_special_chars'] and not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+        if self.config['require_special_chars'] and not _RE_SPECIAL.search(password):
             errors.append("Password must contain at least one special character")
         
         return len(errors) == 0, errors
@@ -94,16 +156,21 @@ class SecurityManager:
         if expires_in is None:
             expires_in = self.config['session_timeout']
         
+        issued_at = int(time.time())
         payload = {
             'user_id': user_data.get('user_id'),
             'username': user_data.get('username'),
             'role': user_data.get('role'),
-            'exp': datetime.utcnow() + timedelta(seconds=expires_in),
-            'iat': datetime.utcnow(),
+            'exp': issued_at + expires_in,
+            'iat': issued_at,
             'jti': secrets.token_urlsafe(16)
         }
         
-        return jwt.encode(payload, self.jwt_secret, algorithm='HS256')
+        # Sign directly with the cached key and header instead of going through jwt.encode
+        payload_segment = _b64url_encode(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        signing_input = self._jwt_header_segment + b'.' + payload_segment
+        signature = hmac.new(self._jwt_key, signing_input, hashlib.sha256).digest()
+        return (signing_input + b'.' + _b64url_encode(signature)).decode('ascii')
     
     def verify_jwt_token(self, token: str) -> Optional[Dict[str, Any]]:
         """Verify and decode a JWT token"""
@@ -117,6 +184,10 @@ class SecurityManager:
             logger.warning(f"Invalid JWT token: {e}")
             return None
     
+    def _stripe(self, key: str) -> threading.Lock:
+        """Get the lock stripe guarding state for a given identifier"""
+        return self._stripes[hash(key) & (LOCK_STRIPES - 1)]
+    
     def check_rate_limit(self, identifier: str, limit: int = None) -> bool:
         """Check if a request is within rate limits"""
         if not self.config['enable_rate_limiting']:
@@ -128,37 +199,35 @@ class SecurityManager:
         current_time = time.time()
         minute_ago = current_time - 60
         
-        # Clean old entries
-        if identifier in self.rate_limits:
-            self.rate_limits[identifier] = [
-                timestamp for timestamp in self.rate_limits[identifier]
-                if timestamp > minute_ago
-            ]
-        else:
-            self.rate_limits[identifier] = []
-        
-        # Check if limit exceeded
-        if len(self.rate_limits[identifier]) >= limit:
-            return False
-        
-        # Add current request
-        self.rate_limits[identifier].append(current_time)
-        return True
+        with self._stripe(identifier):
+            # Drop expired entries from the front; timestamps are appended in order
+            timestamps = self.rate_limits[identifier]
+            while timestamps and timestamps[0] <= minute_ago:
+                timestamps.popleft()
+            
+            # Check if limit exceeded
+            if len(timestamps) >= limit:
+                return False
+            
+            # Add current request
+            timestamps.append(current_time)
+            return True
     
     def check_login_attempts(self, username: str) -> Tuple[bool, int]:
         """Check if user is locked out due to failed login attempts"""
         current_time = time.time()
         
-        if username in self.failed_attempts:
-            attempts, lockout_until = self.failed_attempts[username]
-            
-            # Check if still locked out
-            if current_time < lockout_until:
-                remaining = int(lockout_until - current_time)
-                return False, remaining
-            
-            # Reset if lockout expired
-            del self.failed_attempts[username]
+        with self._stripe(username):
+            if username in self.failed_attempts:
+                attempts, lockout_until = self.failed_attempts[username]
+                
+                # Check if still locked out
+                if current_time < lockout_until:
+                    remaining = int(lockout_until - current_time)
+                    return False, remaining
+                
+                # Reset if lockout expired
+                del self.failed_attempts[username]
         
         return True, 0
     
@@ -166,24 +235,27 @@ class SecurityManager:
         """Record a failed login attempt"""
         current_time = time.time()
         
-        if username in self.failed_attempts:
-            attempts, _ = self.failed_attempts[username]
-            attempts += 1
-        else:
-            attempts = 1
-        
-        # Check if should lock out
-        if attempts >= self.config['max_login_attempts']:
-            lockout_until = current_time + self.config['lockout_duration']
-            self.failed_attempts[username] = (attempts, lockout_until)
+        with self._stripe(username):
+            if username in self.failed_attempts:
+                attempts, _ = self.failed_attempts[username]
+                attempts += 1
+            else:
+                attempts = 1
             
+            # Check if should lock out
+            locked_out = attempts >= self.config['max_login_attempts']
+            if locked_out:
+                lockout_until = current_time + self.config['lockout_duration']
+                self.failed_attempts[username] = (attempts, lockout_until)
+            else:
+                self.failed_attempts[username] = (attempts, 0)
+        
+        if locked_out:
             # Log security event
             self.log_suspicious_activity(
                 'multiple_failed_logins',
                 f"User {username} locked out after {attempts} failed attempts"
             )
-        else:
-            self.failed_attempts[username] = (attempts, 0)
     
     def log_suspicious_activity(self, activity_type: str, description: str, metadata: Dict = None):
         """Log suspicious or security-related activities"""
@@ -198,10 +270,6 @@ class SecurityManager:
         
         self.suspicious_activities.append(activity)
         
-        # Keep only recent activities
-        if len(self.suspicious_activities) > 1000:
-            self.suspicious_activities = self.suspicious_activities[-1000:]
-        
         logger.warning(f"Suspicious activity detected: {activity_type} - {description}")
     
     def _get_client_ip(self) -> str:
@@ -217,12 +285,8 @@ class SecurityManager:
     def sanitize_input(self, input_data: Any) -> Any:
         """Sanitize user input to prevent injection attacks"""
         if isinstance(input_data, str):
-            # Remove potentially dangerous characters
-            sanitized = re.sub(r'[<>"\']', '', input_data)
-            # Limit length
-            if len(sanitized) > 1000:
-                sanitized = sanitized[:1000]
-            return sanitized
+            # Remove potentially dangerous characters and limit length
+            return input_data.translate(_SANITIZE_STRIP_TABLE)[:1000]
         elif isinstance(input_data, dict):
             return {k: self.sanitize_input(v) for k, v in input_data.items()}
         elif isinstance(input_data, list):
@@ -307,6 +371,10 @@ def sanitize_inputs(func):
     return wrapper
 
 # Utility functions
+def sanitize_input(input_data: Any) -> Any:
+    """Sanitize a string, or the strings nested in a dict or list, with the global security manager"""
+    return security_manager.sanitize_input(input_data)
+
 def generate_secure_token(length: int = 32) -> str:
     """Generate a secure random token"""
     return secrets.token_urlsafe(length)
@@ -317,10 +385,8 @@ def hash_data(data: str) -> str:
 
 def validate_email(email: str) -> bool:
     """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _RE_EMAIL.match(email) is not None
 
 def is_safe_filename(filename: str) -> bool:
     """Check if filename is safe (no path traversal)"""
-    dangerous_chars = ['/', '\\', ':', '*', '?', '"', '<', '>', '|']
-    return not any(char in filename for char in dangerous_chars)
\ No newline at end of file
+    return _UNSAFE_FILENAME_CHARS.isdisjoint(filename)
\ No newline at end of file
@@ -1,15 +1,19 @@
 """Authentication utilities for Streamlit dashboard"""
 
 import os
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
 import streamlit as st
-import pandas as pd
 import hashlib
 import json
 from datetime import datetime, timedelta
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Optional, List, Tuple, Union
 from pathlib import Path
 
-from src.utils.enhanced_logging import get_app_logger, get_security_logger, log_with_context, get_session_context
+from src.utils.enhanced_logging import get_app_logger, get_security_logger, log_with_context, get_session_context_cached, clear_session_context_cache
 from src.utils.streamlit_logging import log_authentication_attempt, log_authorization_check, log_security_event
 from src.utils.secure_data import (
     secure_save_json,
@@ -26,6 +30,22 @@ logger = get_app_logger(__name__)
 USER_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
                            'data', 'users.json')
 
+# Decrypted user database, reused while the file's mtime is unchanged. The
+# cached dict is shared by every session thread: reloading it and mutating it
+# (create/update/delete, saves) happen under _USERS_LOCK, and read-only views
+# iterate a snapshot
+_USERS_CACHE = {"mtime": None, "data": None}
+_USERS_LOCK = threading.RLock()
+
+# Number of users per role in the cached database
+_ROLE_COUNTS = Counter()
+
+# last_login updates are coalesced and written at most once per delay window
+LAST_LOGIN_FLUSH_DELAY = 2.0
+_pending_writes: Dict[str, str] = {}  # username -> last_login
+_pending_lock = threading.Lock()
+_flush_timer = None
+
 # Ensure the user database exists
 def ensure_user_db_exists():
     """Create user database if it doesn't exist"""
@@ -61,93 +81,197 @@ def hash_password(password: str) -> Dict[str, str]:
 # User management functions
 def get_users() -> Dict:
     """Get all users from the database"""
-    ensure_user_db_exists()
-    
     try:
-        return secure_load_json(USER_DB_PATH)
+        with _USERS_LOCK:
+            # One stat both validates the cache and tells us whether the file exists
+            try:
+                mtime = os.stat(USER_DB_PATH).st_mtime_ns
+            except FileNotFoundError:
+                ensure_user_db_exists()
+                mtime = os.stat(USER_DB_PATH).st_mtime_ns
+            if _USERS_CACHE["data"] is not None and _USERS_CACHE["mtime"] == mtime:
+                return _USERS_CACHE["data"]
+            
+            users = secure_load_json(USER_DB_PATH)
+            _USERS_CACHE["mtime"] = mtime
+            _USERS_CACHE["data"] = users
+            _count_roles(users)
+            return users
     except Exception as e:
         logger.error(f"Error loading user database: {str(e)}")
         return {}
         
+def _count_roles(users: Dict):
+    """Rebuild the per-role user counts from scratch"""
+    _ROLE_COUNTS.clear()
+    _ROLE_COUNTS.update(user["role"] for user in users.values())
+
 def get_users_data() -> Dict:
     """Get all users from the database (alias for get_users)"""
     return get_users()
 
 def save_users(users: Dict):
     """Save users to the database securely"""
+    with _USERS_LOCK:
+        _save_users(users)
+
+def _save_users(users: Dict):
+    """Write users and refresh the cache; callers hold _USERS_LOCK"""
+    # Apply queued last_login updates to the dict being written, which may be
+    # a fresh reload that never saw them
+    with _pending_lock:
+        pending = dict(_pending_writes)
+        _pending_writes.clear()
+    for username, last_login in pending.items():
+        user = users.get(username)
+        if user is not None:
+            user["last_login"] = last_login
+    
     try:
         # Sanitize data for logging
-        sanitized_users = sanitize_sensitive_data(users, ['password'])
-        logger.debug(f"Saving user database with {len(users)} users: {sanitized_users.keys()}")
+        if logger.isEnabledFor(logging.DEBUG):
+            sanitized_users = sanitize_sensitive_data(users, ['password'])
+            logger.debug(f"Saving user database with {len(users)} users: {sanitized_users.keys()}")
         
         # Save data securely with encryption
         secure_save_json(users, USER_DB_PATH, encrypt=True)
+        
+        # Keep the in-memory copy in step with what was just written; the
+        # mutators below keep the role counts current for the cached dict
+        if users is not _USERS_CACHE["data"]:
+            _count_roles(users)
+        _USERS_CACHE["mtime"] = os.stat(USER_DB_PATH).st_mtime_ns
+        _USERS_CACHE["data"] = users
     except Exception as e:
+        _USERS_CACHE["mtime"] = None
+        _USERS_CACHE["data"] = None
+        # Keep the updates queued for the next save, unless superseded
+        with _pending_lock:
+            for username, last_login in pending.items():
+                _pending_writes.setdefault(username, last_login)
         logger.error(f"Error saving user database: {str(e)}")
 
-def authenticate(username: str, password: str) -> bool:
-    """Authenticate a user"""
+# Users who authenticated recently: username -> (monotonic expiry, user record)
+AUTH_FAST_CACHE_TTL = 30.0
+_AUTH_FAST_CACHE: Dict[str, Tuple[float, Dict]] = {}
+
+# Stand-in hash verified for unknown usernames so both paths do the same work
+_DUMMY_HASH = secure_hash("dummy")
+
+# (user_exists, ok) -> (failure reason, security log message); None means success
+_AUTH_FAILURES = {
+    (True, True): None,
+    (True, False): ("invalid_password", "Failed authentication attempt for user {}"),
+    (False, False): ("user_not_found", "Failed authentication attempt for unknown user {}"),
+}
+
+def _schedule_last_login_flush(username: str, last_login: str):
+    """Queue a deferred save of a user's new last_login"""
+    global _flush_timer
+    with _pending_lock:
+        _pending_writes[username] = last_login
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(LAST_LOGIN_FLUSH_DELAY, flush_pending_writes)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+def flush_pending_writes():
+    """Persist queued last_login updates with a single encrypted write"""
+    global _flush_timer
+    with _pending_lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        if not _pending_writes:
+            return
+        pending_count = len(_pending_writes)
+    
+    # save_users applies the queued updates, even if get_users reloads the file
+    logger.debug(f"Flushing last_login updates for {pending_count} users")
+    with _USERS_LOCK:
+        save_users(get_users())
+
+atexit.register(flush_pending_writes)
+
+def authenticate(username: str, password: str) -> Optional[Dict]:
+    """Authenticate a user, returning their record on success and None otherwise
+    
+    The password is always checked with verify_hash, against a dummy hash when
+    the username is unknown, so that response time does not reveal which
+    usernames exist. verify_hash compares digests in constant time.
+    
+    A user who authenticated within AUTH_FAST_CACHE_TTL seconds, and whose
+    record has not been reloaded or had its password changed since, is
+    re-verified against the cached record with a single log entry.
+    """
     users = get_users()
     security_logger = get_security_logger()
     
+    cached = _AUTH_FAST_CACHE.get(username)
+    if cached is not None:
+        expires_at, cached_user = cached
+        if (expires_at > time.monotonic() and cached_user is users.get(username)
+                and verify_hash(password, cached_user["password"])):
+            last_login = cached_user["last_login"] = datetime.now().isoformat()
+            _schedule_last_login_flush(username, last_login)
+            log_with_context(security_logger, "info", f"User {username} authenticated successfully", {
+                "role": cached_user["role"],
+                "authentication_method": "cached_auth"
+            })
+            return cached_user
+        _AUTH_FAST_CACHE.pop(username, None)
+    
     # Get session context for logging
-    context = get_session_context()
+    context = get_session_context_cached()
     context['username'] = username
     
-    if username in users:
-        user = users[username]
-        
-        # Verify password against stored hash
-        if verify_hash(password, user["password"]):
-            # Update last login time
-            users[username]["last_login"] = datetime.now().isoformat()
-            save_users(users)
-            
-            # Log successful authentication
-            log_authentication_attempt(username, True, {
-                "role": user["role"],
-                "last_login": user.get("last_login"),
-                "ip_address": context.get("ip_address", "unknown")
-            })
-            
-            log_with_context(security_logger, "info", f"User {username} authenticated successfully", {
-                "role": user["role"],
-                "authentication_method": "password"
-            })
-            
-            return True
-        else:
-            # Log failed authentication - wrong password
-            log_authentication_attempt(username, False, {
-                "reason": "invalid_password",
-                "ip_address": context.get("ip_address", "unknown")
-            })
-            
-            log_with_context(security_logger, "warning", f"Failed authentication attempt for user {username}", {
-                "reason": "invalid_password",
-                "authentication_method": "password"
-            })
-    else:
-        # Log failed authentication - user not found
-        log_authentication_attempt(username, False, {
-            "reason": "user_not_found",
+    user = users.get(username)
+    user_exists = user is not None
+    ok = verify_hash(password, user["password"] if user_exists else _DUMMY_HASH)
+    ok &= user_exists
+    
+    failure = _AUTH_FAILURES[(user_exists, ok)]
+    if failure is None:
+        # Update last login time; persisted by the deferred flush
+        last_login = user["last_login"] = datetime.now().isoformat()
+        _schedule_last_login_flush(username, last_login)
+        _AUTH_FAST_CACHE[username] = (time.monotonic() + AUTH_FAST_CACHE_TTL, user)
+        
+        # Log successful authentication
+        role = user["role"]
+        log_authentication_attempt(username, True, {
+            "role": role,
+            "last_login": last_login,
             "ip_address": context.get("ip_address", "unknown")
         })
         
-        log_with_context(security_logger, "warning", f"Failed authentication attempt for unknown user {username}", {
-            "reason": "user_not_found",
+        log_with_context(security_logger, "info", f"User {username} authenticated successfully", {
+            "role": role,
             "authentication_method": "password"
         })
+        
+        return user
+    
+    reason, message = failure
+    log_authentication_attempt(username, False, {
+        "reason": reason,
+        "ip_address": context.get("ip_address", "unknown")
+    })
+    
+    log_with_context(security_logger, "warning", message.format(username), {
+        "reason": reason,
+        "authentication_method": "password"
+    })
     
     logger.warning(f"Failed authentication attempt for user {username}")
-    return False
+    return None
 
 def is_authenticated():
     """Check if user is authenticated"""
-    is_auth = "user" in st.session_state and st.session_state["user"] is not None
+    is_auth = st.session_state.get("user") is not None
     
     # Log authentication check
-    context = get_session_context()
+    context = get_session_context_cached()
     log_authorization_check("session_check", is_auth, {
         "session_id": context.get("session_id", "unknown"),
         "ip_address": context.get("ip_address", "unknown")
@@ -155,26 +279,35 @@ def is_authenticated():
     
     return is_auth
 
-def login_user(username: str):
-    """Set user in session state"""
-    users = get_users()
-    if username in users:
-        st.session_state["user"] = users[username]
+def login_user(user: Union[str, Dict]):
+    """Set user in session state
+    
+    Accepts the record returned by authenticate() directly, so a login does
+    not reload the user database; a username is still accepted and looked up.
+    """
+    if isinstance(user, str):
+        user = get_users().get(user)
+    if user:
+        username = user["username"]
+        role = user.get("role", "user")
+        st.session_state["user"] = user
+        st.session_state["session_start_ts"] = time.time()
+        clear_session_context_cache()
         
         # Log user login
-        context = get_session_context()
+        context = get_session_context_cached()
         context["username"] = username
-        context["role"] = users[username].get("role", "user")
+        context["role"] = role
         
         log_security_event("user_login", {
             "username": username,
-            "role": users[username].get("role", "user"),
+            "role": role,
             "session_id": context.get("session_id", "unknown"),
             "ip_address": context.get("ip_address", "unknown")
         })
         
         log_with_context(get_security_logger(), "info", f"User {username} logged in", {
-            "role": users[username].get("role", "user")
+            "role": role
         })
 
 def logout_user():
@@ -184,7 +317,7 @@ def logout_user():
         role = st.session_state["user"].get("role", "user")
         
         # Log user logout
-        context = get_session_context()
+        context = get_session_context_cached()
         log_security_event("user_logout", {
             "username": username,
             "role": role,
@@ -197,6 +330,8 @@ def logout_user():
         })
         
         del st.session_state["user"]
+        st.session_state.pop("session_start_ts", None)
+        clear_session_context_cache()
 
 def get_current_user():
     """Get current user from session state"""
@@ -204,13 +339,13 @@ def get_current_user():
 
 def require_auth(page_func):
     """Decorator to require authentication for a page"""
+    # Get function name for logging
+    func_name = page_func.__name__
+    
     def wrapper(*args, **kwargs):
-        # Get function name for logging
-        func_name = page_func.__name__
-        
         if not is_authenticated():
             # Log unauthorized access attempt
-            context = get_session_context()
+            context = get_session_context_cached()
             log_authorization_check(func_name, False, {
                 "page": func_name,
                 "session_id": context.get("session_id", "unknown"),
@@ -228,7 +363,7 @@ def require_auth(page_func):
         
         # User is authenticated, log access and call the page function
         current_user = get_current_user()
-        context = get_session_context()
+        context = get_session_context_cached()
         
         log_authorization_check(func_name, True, {
             "page": func_name,
@@ -246,7 +381,7 @@ def display_login_form():
     st.subheader("Login")
     
     # Log login form display
-    context = get_session_context()
+    context = get_session_context_cached()
     log_security_event("login_form_displayed", {
         "session_id": context.get("session_id", "unknown"),
         "ip_address": context.get("ip_address", "unknown")
@@ -266,8 +401,9 @@ def display_login_form():
                 "ip_address": context.get("ip_address", "unknown")
             })
             
-            if authenticate(username, password):
-                login_user(username)
+            user = authenticate(username, password)
+            if user:
+                login_user(user)
                 st.success("Login successful!")
                 st.experimental_rerun()
             else:
@@ -275,90 +411,107 @@ def display_login_form():
 
 def create_user(username: str, password: str, full_name: str, email: str, role: str = "user") -> bool:
     """Create a new user with secure password hashing"""
-    users = get_users()
-    
-    if username in users:
-        logger.warning(f"Attempted to create duplicate user: {username}")
-        return False
-    
-    # Create user with securely hashed password
-    users[username] = {
-        "username": username,
-        "password": hash_password(password),  # Secure hash with salt
-        "full_name": full_name,
-        "email": email,
-        "role": role,
-        "created_at": datetime.now().isoformat(),
-        "last_login": None
-    }
-    
-    # Log sanitized user data
-    sanitized_user = sanitize_sensitive_data(users[username], ['password'])
-    logger.info(f"Creating new user: {sanitized_user}")
-    
-    save_users(users)
-    logger.info(f"Created new user: {username}")
-    return True
+    with _USERS_LOCK:
+        users = get_users()
+        
+        if username in users:
+            logger.warning(f"Attempted to create duplicate user: {username}")
+            return False
+        
+        # Create user with securely hashed password
+        users[username] = {
+            "username": username,
+            "password": hash_password(password),  # Secure hash with salt
+            "full_name": full_name,
+            "email": email,
+            "role": role,
+            "created_at": datetime.now().isoformat(),
+            "last_login": None
+        }
+        _ROLE_COUNTS[role] += 1
+        
+        # Log sanitized user data
+        sanitized_user = {k: v for k, v in users[username].items() if k != 'password'}
+        logger.info(f"Creating new user: {sanitized_user}")
+        
+        save_users(users)
+        logger.info(f"Created new user: {username}")
+        return True
 
 def update_user(username: str, full_name: str = None, email: str = None, role: str = None) -> bool:
     """Update an existing user's information"""
-    users = get_users()
-    
-    if username not in users:
-        logger.warning(f"Attempted to update non-existent user: {username}")
-        return False
-    
-    if full_name is not None:
-        users[username]["full_name"] = full_name
-    
-    if email is not None:
-        users[username]["email"] = email
-    
-    if role is not None:
-        users[username]["role"] = role
-    
-    save_users(users)
-    logger.info(f"Updated user: {username}")
-    return True
+    with _USERS_LOCK:
+        users = get_users()
+        
+        if username not in users:
+            logger.warning(f"Attempted to update non-existent user: {username}")
+            return False
+        
+        if full_name is not None:
+            users[username]["full_name"] = full_name
+        
+        if email is not None:
+            users[username]["email"] = email
+        
+        if role is not None:
+            _ROLE_COUNTS[users[username]["role"]] -= 1
+            _ROLE_COUNTS[role] += 1
+            users[username]["role"] = role
+        
+        save_users(users)
+        logger.info(f"Updated user: {username}")
+        return True
 
 def change_password(username: str, new_password: str) -> bool:
     """Change a user's password with secure hashing"""
-    users = get_users()
-    
-    if username not in users:
-        logger.warning(f"Attempted to change password for non-existent user: {username}")
-        return False
-    
-    # Update with securely hashed password
-    users[username]["password"] = hash_password(new_password)
-    
-    save_users(users)
-    logger.info(f"Changed password for user: {username}")
-    return True
+    with _USERS_LOCK:
+        users = get_users()
+        
+        if username not in users:
+            logger.warning(f"Attempted to change password for non-existent user: {username}")
+            return False
+        
+        # Setting the same password again needs no new hash or write, unless the
+        # stored hash is a legacy one that rehashing would upgrade
+        stored_hash = users[username]["password"]
+        if stored_hash.get("algorithm") == "blake2b" and verify_hash(new_password, stored_hash):
+            logger.info(f"Password unchanged for user: {username}")
+            return True
+        
+        # Update with securely hashed password
+        users[username]["password"] = hash_password(new_password)
+        _AUTH_FAST_CACHE.pop(username, None)
+        
+        save_users(users)
+        logger.info(f"Changed password for user: {username}")
+        return True
 
 def delete_user(username: str) -> bool:
     """Delete a user"""
-    users = get_users()
-    
-    if username not in users:
-        logger.warning(f"Attempted to delete non-existent user: {username}")
-        return False
-    
-    # Don't allow deleting the last admin user
-    if users[username]["role"] == "admin":
-        admin_count = sum(1 for user in users.values() if user["role"] == "admin")
-        if admin_count <= 1:
+    with _USERS_LOCK:
+        users = get_users()
+        
+        if username not in users:
+            logger.warning(f"Attempted to delete non-existent user: {username}")
+            return False
+        
+        # Don't allow deleting the last admin user
+        role = users[username]["role"]
+        if role == "admin" and _ROLE_COUNTS["admin"] <= 1:
             logger.warning(f"Attempted to delete the last admin user: {username}")
             return False
-    
-    del users[username]
-    
-    save_users(users)
-    logger.info(f"Deleted user: {username}")
-    return True
+        
+        del users[username]
+        _ROLE_COUNTS[role] -= 1
+        
+        save_users(users)
+        logger.info(f"Deleted user: {username}")
+        return True
 
 def display_user_management():
     """Display user management interface with secure data handling"""
+    import pandas as pd
+    
     st.subheader("User Management")
     
     # Get current user
@@ -370,18 +523,17 @@ def display_user_management():
         return
     
     # Display existing users with sanitized data
-    users = get_users()
-    user_df = pd.DataFrame([
-        {
-            "Username": user["username"],
-            "Full Name": user["full_name"],
-            "Email": user["email"],
-            "Role": user["role"],
-            "Created": user["created_at"],
-            "Last Login": user["last_login"] or "Never"
-        }
-        for user in users.values()
-    ])
+    with _USERS_LOCK:
+        records = list(get_users().values())
+    usernames = {user["username"] for user in records}
+    user_df = pd.DataFrame({
+        "Username": [user["username"] for user in records],
+        "Full Name": [user["full_name"] for user in records],
+        "Email": [user["email"] for user in records],
+        "Role": [user["role"] for user in records],
+        "Created": [user["created_at"] for user in records],
+        "Last Login": [user["last_login"] or "Never" for user in records]
+    }, copy=False)
     
     st.write("### Existing Users")
     st.dataframe(user_df)
@@ -401,7 +553,7 @@ def display_user_management():
         if submit:
             if not new_username or not new_password:
                 st.error("Username and password are required")
-            elif new_username in users:
+            elif new_username in usernames:
                 st.error(f"User {new_username} already exists")
             elif new_password != new_password_confirm:
                 st.error("Passwords do not match")
@@ -1,9 +1,9 @@
 """Streamlit-specific logging utilities for CredTech XScore"""
 
 import time
+import logging
 import json
 import traceback
-from datetime import datetime
 from functools import wraps
 from typing import Dict, Any, Optional, Union, List, Callable
 
@@ -15,7 +15,7 @@ from src.utils.enhanced_logging import (
     get_interaction_logger,
     get_error_logger,
     get_security_logger,
-    get_session_context,
+    get_session_context_cached,
     log_with_context
 )
 
@@ -24,202 +24,111 @@ logger = get_app_logger(__name__)
 interaction_logger = get_interaction_logger()
 security_logger = get_security_logger()
 
+# Static fields of the security helpers' extra payload, built once at import
+_AUTHENTICATION_EXTRA = {'event_type': 'authentication'}
+_AUTHORIZATION_EXTRA = {'event_type': 'authorization'}
+
+def _make_interaction_logger(template: Dict[str, str], message: str, field_names: tuple) -> Callable:
+    """Build the emitter shared by one kind of interaction log
+    
+    The template, message format and field names are fixed per interaction
+    type and bound as default arguments, so a call only passes the page and
+    the per-call values, in field_names order; message is formatted with them.
+    Records are attributed to the public log_* helper that called emit.
+    """
+    def emit(page, *values, _template=template, _message=message, _field_names=field_names,
+             _logger=interaction_logger):
+        if not _logger.isEnabledFor(logging.INFO):
+            return
+        
+        context = get_session_context_cached()
+        if page is None and 'page' in st.session_state:
+            page = st.session_state['page']
+        
+        _logger.info(
+            _message.format(*values),
+            extra={
+                'extra': {**_template, **dict(zip(_field_names, values)), 'page': page},
+                'context': context
+            },
+            stacklevel=2
+        )
+    return emit
+
+_emit_button_click = _make_interaction_logger(
+    {'interaction_type': 'button_click', 'component': 'button'},
+    "Button clicked: {}", ('component_name',))
+_emit_slider_change = _make_interaction_logger(
+    {'interaction_type': 'slider_change', 'component': 'slider'},
+    "Slider changed: {} = {}", ('component_name', 'value'))
+_emit_input_change = _make_interaction_logger(
+    {'interaction_type': 'input_change', 'component': 'input'},
+    "Input changed: {}", ('component_name', 'value_type'))
+_emit_selectbox_change = _make_interaction_logger(
+    {'interaction_type': 'selectbox_change', 'component': 'selectbox'},
+    "Selectbox changed: {} = {}", ('component_name', 'value'))
+_emit_checkbox_change = _make_interaction_logger(
+    {'interaction_type': 'checkbox_change', 'component': 'checkbox'},
+    "Checkbox changed: {} = {}", ('component_name', 'value'))
+_emit_file_upload = _make_interaction_logger(
+    {'interaction_type': 'file_upload', 'component': 'file_uploader'},
+    "File uploaded: {}", ('file_name', 'file_size', 'file_type'))
+_emit_page_view = _make_interaction_logger(
+    {'interaction_type': 'page_view'},
+    "Page viewed: {}", ())
+_emit_tab_change = _make_interaction_logger(
+    {'interaction_type': 'tab_change', 'component': 'tabs'},
+    "Tab changed: {} -> {}", ('tab_group', 'tab_name'))
+_emit_chart_interaction = _make_interaction_logger(
+    {'interaction_type': 'chart_interaction', 'component': 'chart'},
+    "Chart interaction: {} - {}", ('chart_name', 'chart_interaction_type', 'details'))
+
 # Component interaction logging functions
 def log_button_click(button_name: str, page: Optional[str] = None):
     """Log a button click interaction"""
-    context = get_session_context()
-    if page is None and 'page' in st.session_state:
-        page = st.session_state['page']
-    
-    interaction_logger.info(
-        f"Button clicked: {button_name}",
-        extra={
-            'extra': {
-                'interaction_type': 'button_click',
-                'component': 'button',
-                'component_name': button_name,
-                'page': page,
-                'timestamp': datetime.now().isoformat()
-            },
-            'context': context
-        }
-    )
+    _emit_button_click(page, button_name)
 
 def log_slider_change(slider_name: str, value: Any, page: Optional[str] = None):
     """Log a slider change interaction"""
-    context = get_session_context()
-    if page is None and 'page' in st.session_state:
-        page = st.session_state['page']
-    
-    interaction_logger.info(
-        f"Slider changed: {slider_name} = {value}",
-        extra={
-            'extra': {
-                'interaction_type': 'slider_change',
-                'component': 'slider',
-                'component_name': slider_name,
-                'value': str(value),
-                'page': page,
-                'timestamp': datetime.now().isoformat()
-            },
-            'context': context
-        }
-    )
+    _emit_slider_change(page, slider_name, str(value))
 
 def log_input_change(input_name: str, value_type: str, page: Optional[str] = None):
     """Log an input change interaction (without logging the actual value for privacy)"""
-    context = get_session_context()
-    if page is None and 'page' in st.session_state:
-        page = st.session_state['page']
-    
-    interaction_logger.info(
-        f"Input changed: {input_name}",
-        extra={
-            'extra': {
-                'interaction_type': 'input_change',
-                'component': 'input',
-                'component_name': input_name,
-                'value_type': value_type,
-                'page': page,
-                'timestamp': datetime.now().isoformat()
-            },
-            'context': context
-        }
-    )
+    _emit_input_change(page, input_name, value_type)
 
 def log_selectbox_change(selectbox_name: str, value: Any, page: Optional[str] = None):
     """Log a selectbox change interaction"""
-    context = get_session_context()
-    if page is None and 'page' in st.session_state:
-        page = st.session_state['page']
-    
-    interaction_logger.info(
-        f"Selectbox changed: {selectbox_name} = {value}",
-        extra={
-            'extra': {
-                'interaction_type': 'selectbox_change',
-                'component': 'selectbox',
-                'component_name': selectbox_name,
-                'value': str(value),
-                'page': page,
-                'timestamp': datetime.now().isoformat()
-            },
-            'context': context
-        }
-    )
+    _emit_selectbox_change(page, selectbox_name, str(value))
 
 def log_checkbox_change(checkbox_name: str, value: bool, page: Optional[str] = None):
     """Log a checkbox change interaction"""
-    context = get_session_context()
-    if page is None and 'page' in st.session_state:
-        page = st.session_state['page']
-    
-    interaction_logger.info(
-        f"Checkbox changed: {checkbox_name} = {value}",
-        extra={
-            'extra': {
-                'interaction_type': 'checkbox_change',
-                'component': 'checkbox',
-                'component_name': checkbox_name,
-                'value': value,
-                'page': page,
-                'timestamp': datetime.now().isoformat()
-            },
-            'context': context
-        }
-    )
+    _emit_checkbox_change(page, checkbox_name, value)
 
 def log_file_upload(file_name: str, file_size: int, file_type: str, page: Optional[str] = None):
     """Log a file upload interaction"""
-    context = get_session_context()
-    if page is None and 'page' in st.session_state:
-        page = st.session_state['page']
-    
-    interaction_logger.info(
-        f"File uploaded: {file_name}",
-        extra={
-            'extra': {
-                'interaction_type': 'file_upload',
-                'component': 'file_uploader',
-                'file_name': file_name,
-                'file_size': file_size,
-                'file_type': file_type,
-                'page': page,
-                'timestamp': datetime.now().isoformat()
-            },
-            'context': context
-        }
-    )
+    _emit_file_upload(page, file_name, file_size, file_type)
 
 def log_page_view(page_name: str):
     """Log a page view interaction"""
-    context = get_session_context()
-    
-    interaction_logger.info(
-        f"Page viewed: {page_name}",
-        extra={
-            'extra': {
-                'interaction_type': 'page_view',
-                'page': page_name,
-                'timestamp': datetime.now().isoformat()
-            },
-            'context': context
-        }
-    )
+    _emit_page_view(page_name, page_name)
 
 def log_tab_change(tab_group: str, tab_name: str, page: Optional[str] = None):
     """Log a tab change interaction"""
-    context = get_session_context()
-    if page is None and 'page' in st.session_state:
-        page = st.session_state['page']
-    
-    interaction_logger.info(
-        f"Tab changed: {tab_group} -> {tab_name}",
-        extra={
-            'extra': {
-                'interaction_type': 'tab_change',
-                'component': 'tabs',
-                'tab_group': tab_group,
-                'tab_name': tab_name,
-                'page': page,
-                'timestamp': datetime.now().isoformat()
-            },
-            'context': context
-        }
-    )
+    _emit_tab_change(page, tab_group, tab_name)
 
 def log_chart_interaction(chart_name: str, interaction_type: str, details: Dict[str, Any] = None, page: Optional[str] = None):
     """Log a chart interaction (zoom, pan, click, etc.)"""
-    context = get_session_context()
-    if page is None and 'page' in st.session_state:
-        page = st.session_state['page']
-    
-    if details is None:
-        details = {}
-    
-    interaction_logger.info(
-        f"Chart interaction: {chart_name} - {interaction_type}",
-        extra={
-            'extra': {
-                'interaction_type': 'chart_interaction',
-                'component': 'chart',
-                'chart_name': chart_name,
-                'chart_interaction_type': interaction_type,
-                'details': details,
-                'page': page,
-                'timestamp': datetime.now().isoformat()
-            },
-            'context': context
-        }
-    )
+    _emit_chart_interaction(page, chart_name, interaction_type, {} if details is None else details)
 
 # Performance tracking for Streamlit components
 def log_component_render_time(component_name: str, render_time_ms: float, page: Optional[str] = None):
     """Log the render time for a Streamlit component"""
     from src.utils.enhanced_logging import get_performance_logger
     performance_logger = get_performance_logger()
+    if not performance_logger.isEnabledFor(logging.INFO):
+        return
     
-    context = get_session_context()
+    context = get_session_context_cached()
     if page is None and 'page' in st.session_state:
         page = st.session_state['page']
     
@@ -229,8 +138,7 @@ def log_component_render_time(component_name: str, render_time_ms: float, page:
             'extra': {
                 'component': component_name,
                 'render_time_ms': render_time_ms,
-                'page': page,
-                'timestamp': datetime.now().isoformat()
+                'page': page
             },
             'context': context
         }
@@ -240,15 +148,17 @@ def log_component_render_time(component_name: str, render_time_ms: float, page:
 def measure_render_time(component_name: str):
     """Decorator to measure and log the render time of a function"""
     def decorator(func):
+        log_render_time = log_component_render_time
+        perf_counter_ns = time.perf_counter_ns
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            start_time = time.time()
+            start_ns = perf_counter_ns()
             result = func(*args, **kwargs)
-            end_time = time.time()
-            render_time_ms = (end_time - start_time) * 1000
+            render_time_ms = (perf_counter_ns() - start_ns) / 1_000_000
             
             # Log the render time
-            log_component_render_time(component_name, render_time_ms)
+            log_render_time(component_name, render_time_ms)
             
             return result
         return wrapper
@@ -257,7 +167,10 @@ def measure_render_time(component_name: str):
 # Security logging functions
 def log_authentication_attempt(username: str, success: bool, ip_address: Optional[str] = None):
     """Log an authentication attempt"""
-    context = get_session_context()
+    if not security_logger.isEnabledFor(logging.INFO):
+        return
+    
+    context = get_session_context_cached()
     
     # Don't log the username if authentication failed (security best practice)
     if not success:
@@ -267,11 +180,10 @@ def log_authentication_attempt(username: str, success: bool, ip_address: Optiona
         f"Authentication attempt: {'Success' if success else 'Failure'}",
         extra={
             'extra': {
-                'event_type': 'authentication',
+                **_AUTHENTICATION_EXTRA,
                 'username': username,
                 'success': success,
-                'ip_address': ip_address,
-                'timestamp': datetime.now().isoformat()
+                'ip_address': ip_address
             },
             'context': context
         }
@@ -279,17 +191,19 @@ def log_authentication_attempt(username: str, success: bool, ip_address: Optiona
 
 def log_authorization_check(resource: str, action: str, allowed: bool):
     """Log an authorization check"""
-    context = get_session_context()
+    if not security_logger.isEnabledFor(logging.INFO):
+        return
+    
+    context = get_session_context_cached()
     
     security_logger.info(
         f"Authorization check: {action} on {resource} - {'Allowed' if allowed else 'Denied'}",
         extra={
             'extra': {
-                'event_type': 'authorization',
+                **_AUTHORIZATION_EXTRA,
                 'resource': resource,
                 'action': action,
-                'allowed': allowed,
-                'timestamp': datetime.now().isoformat()
+                'allowed': allowed
             },
             'context': context
         }
@@ -297,15 +211,17 @@ def log_authorization_check(resource: str, action: str, allowed: bool):
 
 def log_security_event(event_type: str, details: Dict[str, Any]):
     """Log a general security event"""
-    context = get_session_context()
+    if not security_logger.isEnabledFor(logging.INFO):
+        return
+    
+    context = get_session_context_cached()
     
     security_logger.info(
         f"Security event: {event_type}",
         extra={
             'extra': {
                 'event_type': event_type,
-                'details': details,
-                'timestamp': datetime.now().isoformat()
+                'details': details
             },
             'context': context
         }
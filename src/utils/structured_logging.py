@@ -1,21 +1,37 @@
 """Structured logging for machine-readable formats and analytics"""
 
-import json
+import atexit
+import glob
 import logging
+import logging.handlers
+import mmap
 import os
+import queue
+import random
+import threading
 import time
-from datetime import datetime
+from collections import deque
+from datetime import date, datetime
 from typing import Dict, Any, Optional, List, Union
 
+import orjson
+
 from src.utils.enhanced_logging import (
     get_app_logger, get_access_logger, get_error_logger, 
     get_performance_logger, get_interaction_logger, get_security_logger,
-    get_session_context, log_with_context
+    get_session_info, RawJSON
 )
 
 # Set up logger
 logger = get_app_logger(__name__)
 
+# Loggers the structured events are mirrored to, resolved once
+_interaction_logger = get_interaction_logger()
+_performance_logger = get_performance_logger()
+_security_logger = get_security_logger()
+_error_logger = get_error_logger()
+_access_logger = get_access_logger()
+
 # Constants
 STRUCTURED_LOG_DIRECTORY = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 
@@ -25,6 +41,23 @@ STRUCTURED_LOG_DIRECTORY = os.path.join(
 # Ensure structured log directory exists
 os.makedirs(STRUCTURED_LOG_DIRECTORY, exist_ok=True)
 
+# orjson options for one JSONL record; numpy arrays and scalars from model
+# code are encoded natively
+_JSONL_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _json_default(obj: Any) -> Any:
+    """Encode values orjson has no native support for instead of failing the record"""
+    # Subclasses such as pandas.Timestamp are not encoded natively
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # pandas Series/Index and ndarrays of dtypes orjson cannot encode directly
+    tolist = getattr(obj, 'tolist', None)
+    if callable(tolist):
+        return tolist()
+    return str(obj)
+
 # Define structured log types
 LOG_TYPES = {
     'user_activity': os.path.join(STRUCTURED_LOG_DIRECTORY, 'user_activity.jsonl'),
@@ -35,9 +68,280 @@ LOG_TYPES = {
     'api_requests': os.path.join(STRUCTURED_LOG_DIRECTORY, 'api_requests.jsonl')
 }
 
+def _parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse 'metric=rate,metric=rate' into a metric name -> rate mapping"""
+    rates = {}
+    for item in spec.split(','):
+        name, sep, rate = item.partition('=')
+        if sep and name.strip():
+            try:
+                rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+            except ValueError:
+                logger.warning(f"Ignoring invalid metric sample rate: {item}")
+    return rates
+
+# Log types that are written at all; STRUCTURED_LOG_TYPES (comma-separated)
+# narrows it down. The log_* functions for other types return True at once.
+_ENABLED_LOG_TYPES = frozenset(
+    t.strip() for t in os.getenv('STRUCTURED_LOG_TYPES', ','.join(LOG_TYPES)).split(',')
+) & LOG_TYPES.keys()
+
+# Fraction of each metric's samples written to the performance log, from
+# METRIC_SAMPLE_RATES ('name=rate,...'); unlisted metrics are always written
+_METRIC_SAMPLE_RATES = _parse_sample_rates(os.getenv('METRIC_SAMPLE_RATES', ''))
+
+# Request data keys whose values are never written to the API request log
+_SENSITIVE_KEYS = frozenset({'password', 'token', 'api_key', 'secret', 'authorization', 'cookie'})
+
+# (epoch second, formatted 'YYYY-MM-DDTHH:MM:SS' prefix) of the last timestamp
+_timestamp_cache = (None, '')
+
+def _timestamp() -> str:
+    """Local ISO 8601 timestamp with microseconds, reformatting the date and
+    time part only when the second changes"""
+    global _timestamp_cache
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _timestamp_cache
+    if second != cached_second:
+        prefix = datetime.fromtimestamp(second).strftime('%Y-%m-%dT%H:%M:%S')
+        _timestamp_cache = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}"
+
+# Pending JSONL bytes are written out once this much is buffered or the
+# flush interval (seconds) has passed
+WRITE_BUFFER_SIZE = 64 * 1024
+WRITE_FLUSH_INTERVAL = 0.1
+
+# Fixed size of each log type's reusable write buffer; longer lines bypass it
+WRITE_BUFFER_CAPACITY = 128 * 1024
+
+# A log file is renamed to <name>.<YYYYMMDD-HHMMSS>.jsonl and started afresh
+# once it grows past this size
+LOG_ROTATE_SIZE = 64 * 1024 * 1024
+
+# Written log files are fdatasync'd at most once per interval (seconds), or
+# sooner once this many lines are waiting on it
+WRITE_SYNC_INTERVAL = 0.1
+WRITE_SYNC_RECORDS = 1000
+
+# fdatasync skips the metadata write fsync does; not every platform has it
+_datasync = getattr(os, 'fdatasync', os.fsync)
+
+# Queue marker asking the writer thread to write out everything it holds
+_FLUSH = object()
+
+class StructuredLogWriter:
+    """Background writer that batches JSONL lines per log type
+    
+    Callers enqueue already-serialized lines. A daemon thread copies them into
+    one preallocated buffer per log type, reused for the life of the writer,
+    and writes the filled part of each buffer with a single os.write on a
+    file descriptor opened once with O_APPEND. Written files are synced with
+    one fdatasync per batch of lines rather than per line, and rotated once
+    they reach rotate_size bytes.
+    """
+    
+    def __init__(self, paths: Dict[str, str], buffer_size: int = WRITE_BUFFER_SIZE,
+                 flush_interval: float = WRITE_FLUSH_INTERVAL,
+                 sync_interval: float = WRITE_SYNC_INTERVAL,
+                 sync_records: int = WRITE_SYNC_RECORDS,
+                 rotate_size: int = LOG_ROTATE_SIZE):
+        self.paths = paths
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.sync_interval = sync_interval
+        self.sync_records = sync_records
+        self.rotate_size = rotate_size
+        self.queue = queue.SimpleQueue()
+        self.buffers: Dict[str, memoryview] = {}
+        self.fill: Dict[str, int] = {}
+        self.fds: Dict[str, int] = {}
+        self.sizes: Dict[str, int] = {}
+        self.pending = 0
+        self.unsynced: set = set()
+        self.unsynced_records = 0
+        self.thread = None
+        self._start_lock = threading.Lock()
+    
+    def write(self, log_type: str, line: bytes) -> None:
+        """Queue one serialized line for log_type"""
+        if self.thread is None:
+            self.start()
+        self.queue.put((log_type, line))
+    
+    def start(self) -> None:
+        """Start the writer thread if it is not running"""
+        with self._start_lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="structured-log-writer", daemon=True)
+                self.thread.start()
+    
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until every line queued so far has been written and synced"""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        done = threading.Event()
+        self.queue.put((_FLUSH, done))
+        done.wait(timeout)
+    
+    def _run(self) -> None:
+        last_write = last_sync = time.monotonic()
+        while True:
+            try:
+                log_type, item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                log_type = None
+            
+            if log_type is _FLUSH:
+                self._write_buffers()
+                self._sync()
+                last_write = last_sync = time.monotonic()
+                item.set()
+                continue
+            
+            if log_type is not None:
+                self._append(log_type, item)
+            
+            now = time.monotonic()
+            sync_due = self.unsynced_records >= self.sync_records
+            if sync_due or self.pending >= self.buffer_size or (self.pending and now - last_write >= self.flush_interval):
+                self._write_buffers()
+                last_write = now
+            
+            if self.unsynced and (sync_due or now - last_sync >= self.sync_interval):
+                self._sync()
+                last_sync = now
+    
+    def _append(self, log_type: str, line: bytes) -> None:
+        buf = self.buffers.get(log_type)
+        if buf is None:
+            buf = self.buffers[log_type] = memoryview(bytearray(WRITE_BUFFER_CAPACITY))
+            self.fill[log_type] = 0
+        
+        self.unsynced_records += 1
+        size = len(line)
+        if self.fill[log_type] + size > WRITE_BUFFER_CAPACITY:
+            self._write_buffer(log_type)
+            if size > WRITE_BUFFER_CAPACITY:
+                self._write(log_type, line)
+                return
+        
+        start = self.fill[log_type]
+        buf[start:start + size] = line
+        self.fill[log_type] = start + size
+        self.pending += size
+    
+    def _write_buffers(self) -> None:
+        for log_type in self.buffers:
+            self._write_buffer(log_type)
+        self.pending = 0
+    
+    def _write_buffer(self, log_type: str) -> None:
+        filled = self.fill[log_type]
+        if filled:
+            self._write(log_type, self.buffers[log_type][:filled])
+            self.fill[log_type] = 0
+            self.pending -= filled
+    
+    def _write(self, log_type: str, data) -> None:
+        try:
+            fd = self._fd(log_type)
+            written = os.write(fd, data)
+            while written < len(data):
+                written += os.write(fd, data[written:])
+            self.unsynced.add(fd)
+            self.sizes[log_type] += written
+            if self.sizes[log_type] >= self.rotate_size:
+                self._rotate(log_type)
+        except OSError as e:
+            logger.error(f"Failed to write structured log: {str(e)}")
+    
+    def _rotate(self, log_type: str) -> None:
+        """Close log_type's file and move it aside; the next write starts a new one"""
+        fd = self.fds.pop(log_type)
+        if fd in self.unsynced:
+            self.unsynced.discard(fd)
+            _datasync(fd)
+        os.close(fd)
+        
+        path = self.paths[log_type]
+        stem = path[:-len('.jsonl')] if path.endswith('.jsonl') else path
+        suffix = datetime.now().strftime('%Y%m%d-%H%M%S')
+        rotated = f"{stem}.{suffix}.jsonl"
+        counter = 1
+        while os.path.exists(rotated):
+            rotated = f"{stem}.{suffix}-{counter}.jsonl"
+            counter += 1
+        os.rename(path, rotated)
+    
+    def _sync(self) -> None:
+        for fd in self.unsynced:
+            try:
+                _datasync(fd)
+            except OSError as e:
+                logger.error(f"Failed to sync structured log: {str(e)}")
+        self.unsynced.clear()
+        self.unsynced_records = 0
+    
+    def _fd(self, log_type: str) -> int:
+        fd = self.fds.get(log_type)
+        if fd is None:
+            fd = os.open(self.paths[log_type], os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self.fds[log_type] = fd
+            self.sizes[log_type] = os.fstat(fd).st_size
+        return fd
+
+# Shared writer for all structured log types
+_writer = StructuredLogWriter(LOG_TYPES)
+
+def flush_structured_logs() -> None:
+    """Write out all buffered structured log lines"""
+    _writer.flush()
+
+atexit.register(flush_structured_logs)
+
+_LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+    'critical': logging.CRITICAL
+}
+
+class _DispatchHandler(logging.Handler):
+    """Pass a queued record to the handlers of the logger it was created for"""
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+# Mirrored log records are formatted and written by a QueueListener thread
+_dispatch_queue = queue.SimpleQueue()
+_dispatch_listener = logging.handlers.QueueListener(_dispatch_queue, _DispatchHandler())
+_dispatch_listener.start()
+atexit.register(_dispatch_listener.stop)
+
+def _log_async(target_logger: logging.Logger, level: str, message: str,
+               context: Union[Dict[str, Any], RawJSON]) -> None:
+    """Queue a record shaped like log_with_context(target_logger, level, message, context)
+    
+    Only the LogRecord is built on the calling thread; formatting and file
+    I/O happen on the listener thread.
+    """
+    levelno = _LEVELS.get(level.lower(), logging.INFO)
+    if not target_logger.isEnabledFor(levelno):
+        return
+    fn, lno, func, sinfo = target_logger.findCaller(False, 2)
+    _dispatch_queue.put(target_logger.makeRecord(
+        target_logger.name, levelno, fn, lno, message, None, None, func, {'context': context}, sinfo
+    ))
+
 def write_structured_log(log_type: str, data: Dict[str, Any]) -> bool:
     """Write structured log data to the appropriate file
     
+    The record is serialized immediately and written by the background
+    StructuredLogWriter; call flush_structured_logs() to wait for it.
+    
     Args:
         log_type: Type of log (must be one of LOG_TYPES keys)
         data: Dictionary of log data
@@ -45,24 +349,31 @@ def write_structured_log(log_type: str, data: Dict[str, Any]) -> bool:
     Returns:
         bool: True if successful, False otherwise
     """
+    return _write_structured_log(log_type, data) is not None
+
+def _write_structured_log(log_type: str, data: Dict[str, Any]) -> Optional[bytes]:
+    """write_structured_log() returning the serialized line, or None on failure"""
     if log_type not in LOG_TYPES:
         logger.error(f"Invalid log type: {log_type}. Must be one of {list(LOG_TYPES.keys())}")
-        return False
-    
-    log_file = LOG_TYPES[log_type]
+        return None
     
     try:
         # Add timestamp if not present
         if 'timestamp' not in data:
-            data['timestamp'] = datetime.now().isoformat()
+            data['timestamp'] = _timestamp()
             
-        # Write to log file
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(data) + '\n')
-        return True
+        # Hand the serialized line to the background writer
+        line = orjson.dumps(data, default=_json_default, option=_JSONL_OPTIONS)
+        _writer.write(log_type, line)
+        return line
     except Exception as e:
         logger.error(f"Failed to write structured log: {str(e)}")
-        return False
+        return None
+
+def _context_from_line(key: str, line: bytes) -> RawJSON:
+    """The context {key: <record>} for a mirrored record, reusing the record's
+    serialized JSONL line instead of encoding the record a second time"""
+    return RawJSON(b'{"%s": %s}' % (key.encode(), line[:-1]))
 
 def log_user_activity(activity_type: str, user_id: str, details: Dict[str, Any]) -> bool:
     """Log user activity in structured format
@@ -75,17 +386,20 @@ def log_user_activity(activity_type: str, user_id: str, details: Dict[str, Any])
     Returns:
         bool: True if successful, False otherwise
     """
+    if 'user_activity' not in _ENABLED_LOG_TYPES:
+        return True
+    
     # Get session context
-    context = get_session_context()
+    session = get_session_info()
     
     # Create structured log data
     log_data = {
         'activity_type': activity_type,
         'user_id': user_id,
-        'session_id': context.get('session_id', ''),
-        'ip_address': context.get('ip_address', ''),
-        'user_agent': context.get('user_agent', ''),
-        'page': context.get('page', ''),
+        'session_id': session.session_id,
+        'ip_address': session.ip_address,
+        'user_agent': session.user_agent,
+        'page': session.page,
         'details': details
     }
     
@@ -94,8 +408,8 @@ def log_user_activity(activity_type: str, user_id: str, details: Dict[str, Any])
     
     # Also log to regular logs
     if success:
-        log_with_context(
-            get_interaction_logger(),
+        _log_async(
+            _interaction_logger,
             'info',
             f"User activity: {activity_type} by {user_id}",
             {'activity_details': details}
@@ -103,6 +417,12 @@ def log_user_activity(activity_type: str, user_id: str, details: Dict[str, Any])
     
     return success
 
+# Recent (epoch seconds, metric name, value) samples logged by this process,
+# so aggregate_metrics can usually avoid reading the log file
+RECENT_METRICS_SIZE = 10000
+_recent_metrics = deque(maxlen=RECENT_METRICS_SIZE)
+_recent_metrics_since = time.time()
+
 def log_performance_metric(metric_name: str, value: Union[float, int], 
                           component: str, details: Optional[Dict[str, Any]] = None) -> bool:
     """Log performance metric in structured format
@@ -116,6 +436,17 @@ def log_performance_metric(metric_name: str, value: Union[float, int],
     Returns:
         bool: True if successful, False otherwise
     """
+    now = time.time()
+    # In-memory samples for aggregate_metrics are kept even when the log
+    # write is disabled or sampled out
+    _recent_metrics.append((now, metric_name, value))
+    
+    if 'performance_metrics' not in _ENABLED_LOG_TYPES:
+        return True
+    sample_rate = _METRIC_SAMPLE_RATES.get(metric_name)
+    if sample_rate is not None and random.random() >= sample_rate:
+        return True
+    
     if details is None:
         details = {}
     
@@ -124,7 +455,8 @@ def log_performance_metric(metric_name: str, value: Union[float, int],
         'metric_name': metric_name,
         'value': value,
         'component': component,
-        'details': details
+        'details': details,
+        'timestamp_epoch': now
     }
     
     # Write to structured log
@@ -132,8 +464,8 @@ def log_performance_metric(metric_name: str, value: Union[float, int],
     
     # Also log to regular logs
     if success:
-        log_with_context(
-            get_performance_logger(),
+        _log_async(
+            _performance_logger,
             'info',
             f"Performance metric: {metric_name}={value} for {component}",
             {'metric_details': details}
@@ -152,16 +484,19 @@ def log_security_event(event_type: str, severity: str, details: Dict[str, Any])
     Returns:
         bool: True if successful, False otherwise
     """
+    if 'security_events' not in _ENABLED_LOG_TYPES:
+        return True
+    
     # Get session context
-    context = get_session_context()
+    session = get_session_info()
     
     # Create structured log data
     log_data = {
         'event_type': event_type,
         'severity': severity,
-        'session_id': context.get('session_id', ''),
-        'ip_address': context.get('ip_address', ''),
-        'user_id': context.get('username', ''),
+        'session_id': session.session_id,
+        'ip_address': session.ip_address,
+        'user_id': session.username,
         'details': details
     }
     
@@ -171,8 +506,8 @@ def log_security_event(event_type: str, severity: str, details: Dict[str, Any])
     # Also log to regular logs with appropriate level based on severity
     if success:
         level = 'warning' if severity in ['low', 'medium'] else 'error'
-        log_with_context(
-            get_security_logger(),
+        _log_async(
+            _security_logger,
             level,
             f"Security event: {event_type} ({severity})",
             {'security_details': details}
@@ -195,16 +530,19 @@ def log_model_prediction(model_name: str, input_data: Dict[str, Any],
     Returns:
         bool: True if successful, False otherwise
     """
+    if 'model_predictions' not in _ENABLED_LOG_TYPES:
+        return True
+    
     # Get session context
-    context = get_session_context()
+    session = get_session_info()
     
     # Create structured log data
     log_data = {
         'model_name': model_name,
         'input_data': input_data,
         'prediction': prediction,
-        'session_id': context.get('session_id', ''),
-        'user_id': context.get('username', '')
+        'session_id': session.session_id,
+        'user_id': session.username
     }
     
     # Add optional fields
@@ -215,18 +553,18 @@ def log_model_prediction(model_name: str, input_data: Dict[str, Any],
         log_data['execution_time_ms'] = execution_time
     
     # Write to structured log
-    success = write_structured_log('model_predictions', log_data)
+    line = _write_structured_log('model_predictions', log_data)
     
     # Also log to regular logs
-    if success:
-        log_with_context(
-            get_app_logger(),
+    if line is not None:
+        _log_async(
+            logger,
             'info',
             f"Model prediction: {model_name} = {prediction}",
-            {'prediction_details': log_data}
+            _context_from_line('prediction_details', line)
         )
     
-    return success
+    return line is not None
 
 def log_structured_error(error_type: str, message: str, 
                        details: Optional[Dict[str, Any]] = None,
@@ -242,19 +580,22 @@ def log_structured_error(error_type: str, message: str,
     Returns:
         bool: True if successful, False otherwise
     """
+    if 'errors' not in _ENABLED_LOG_TYPES:
+        return True
+    
     if details is None:
         details = {}
     
     # Get session context
-    context = get_session_context()
+    session = get_session_info()
     
     # Create structured log data
     log_data = {
         'error_type': error_type,
         'message': message,
-        'session_id': context.get('session_id', ''),
-        'user_id': context.get('username', ''),
-        'page': context.get('page', ''),
+        'session_id': session.session_id,
+        'user_id': session.username,
+        'page': session.page,
         'details': details
     }
     
@@ -267,8 +608,8 @@ def log_structured_error(error_type: str, message: str,
     
     # Also log to regular logs
     if success:
-        log_with_context(
-            get_error_logger(),
+        _log_async(
+            _error_logger,
             'error',
             f"Error: {error_type} - {message}",
             {'error_details': details, 'stack_trace': stack_trace}
@@ -290,8 +631,11 @@ def log_api_request(endpoint: str, method: str, status_code: int,
     Returns:
         bool: True if successful, False otherwise
     """
+    if 'api_requests' not in _ENABLED_LOG_TYPES:
+        return True
+    
     # Get session context
-    context = get_session_context()
+    session = get_session_info()
     
     # Create structured log data
     log_data = {
@@ -299,71 +643,168 @@ def log_api_request(endpoint: str, method: str, status_code: int,
         'method': method,
         'status_code': status_code,
         'response_time_ms': response_time,
-        'session_id': context.get('session_id', ''),
-        'user_id': context.get('username', ''),
-        'ip_address': context.get('ip_address', '')
+        'session_id': session.session_id,
+        'user_id': session.username,
+        'ip_address': session.ip_address
     }
     
     # Add request data if available
     if request_data:
-        # Remove sensitive data
-        if 'password' in request_data:
-            request_data['password'] = '[REDACTED]'
+        # Redact sensitive values in a copy, leaving the caller's dict untouched
+        if not _SENSITIVE_KEYS.isdisjoint(request_data):
+            request_data = {k: ('[REDACTED]' if k in _SENSITIVE_KEYS else v) for k, v in request_data.items()}
         log_data['request_data'] = request_data
     
     # Write to structured log
-    success = write_structured_log('api_requests', log_data)
+    line = _write_structured_log('api_requests', log_data)
     
     # Also log to regular logs
-    if success:
+    if line is not None:
         level = 'error' if status_code >= 400 else 'info'
-        log_with_context(
-            get_access_logger(),
+        _log_async(
+            _access_logger,
             level,
             f"API {method} {endpoint} - {status_code} in {response_time:.2f}ms",
-            {'api_details': log_data}
+            _context_from_line('api_details', line)
         )
     
-    return success
+    return line is not None
+
+def _parse_line(line: bytes, filter_func: Optional[callable]) -> Optional[Dict[str, Any]]:
+    """Parse one JSONL line; None if it is malformed or filter_func rejects it"""
+    try:
+        log_entry = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return None
+    if filter_func is None or filter_func(log_entry):
+        return log_entry
+    return None
+
+def _read_tail(mm: mmap.mmap, limit: int, filter_func: Optional[callable]) -> List[Dict[str, Any]]:
+    """Return the last `limit` matching entries of a mapped JSONL file
+    
+    Walks the mapping backwards one line at a time, so only the lines needed
+    to find `limit` entries are paged in and parsed.
+    """
+    entries = []
+    end = len(mm)
+    if end and mm[end - 1] == 0x0A:
+        end -= 1
+    while end > 0 and len(entries) < limit:
+        start = mm.rfind(b'\n', 0, end) + 1
+        log_entry = _parse_line(mm[start:end], filter_func)
+        if log_entry is not None:
+            entries.append(log_entry)
+        end = start - 1
+    entries.reverse()
+    return entries
+
+def _read_head(mm: mmap.mmap, limit: int, filter_func: Optional[callable]) -> List[Dict[str, Any]]:
+    """Return the first `limit` matching entries of a mapped JSONL file"""
+    entries = []
+    size = len(mm)
+    start = 0
+    while start < size and len(entries) < limit:
+        end = mm.find(b'\n', start)
+        if end == -1:
+            end = size
+        log_entry = _parse_line(mm[start:end], filter_func)
+        if log_entry is not None:
+            entries.append(log_entry)
+        start = end + 1
+    return entries
+
+def _map_log(path: str) -> Optional[mmap.mmap]:
+    """Read-only mapping of a log file, or None if it is empty"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _log_files(log_file: str, since: Optional[float] = None) -> List[str]:
+    """The live log file and its rotated predecessors, newest first
+    
+    Rotated files last modified before `since` (epoch seconds) hold only
+    older entries and are left out.
+    """
+    stem = log_file[:-len('.jsonl')] if log_file.endswith('.jsonl') else log_file
+    rotated = []
+    for path in glob.glob(f"{glob.escape(stem)}.*.jsonl"):
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        if since is None or mtime >= since:
+            rotated.append((mtime, path))
+    rotated.sort(reverse=True)
+    
+    files = [log_file] if os.path.exists(log_file) else []
+    return files + [path for _, path in rotated]
+
+def _read_logs(log_file: str, limit: int, filter_func: Optional[callable],
+               tail: bool, since: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Read up to `limit` entries across a log file and its rotated files"""
+    files = _log_files(log_file, since)
+    if not tail:
+        files.reverse()
+    
+    logs = []
+    for path in files:
+        if len(logs) >= limit:
+            break
+        mm = _map_log(path)
+        if mm is None:
+            continue
+        with mm:
+            if tail:
+                logs = _read_tail(mm, limit - len(logs), filter_func) + logs
+            else:
+                logs += _read_head(mm, limit - len(logs), filter_func)
+    return logs
 
 def get_structured_logs(log_type: str, limit: int = 100, 
-                      filter_func: Optional[callable] = None) -> List[Dict[str, Any]]:
+                      filter_func: Optional[callable] = None,
+                      tail: bool = True) -> List[Dict[str, Any]]:
     """Get structured logs of a specific type
     
     Args:
         log_type: Type of log (must be one of LOG_TYPES keys)
         limit: Maximum number of logs to return
         filter_func: Optional function to filter logs
+        tail: Return the most recent matching entries, reading the files from
+            the end; when False, return the oldest ones, reading from the start
+        
+    Rotated files are read after (tail) or before (not tail) the live file.
         
     Returns:
-        List[Dict[str, Any]]: List of log entries
+        List[Dict[str, Any]]: List of log entries, oldest first
     """
     if log_type not in LOG_TYPES:
         logger.error(f"Invalid log type: {log_type}. Must be one of {list(LOG_TYPES.keys())}")
         return []
     
-    log_file = LOG_TYPES[log_type]
-    
-    if not os.path.exists(log_file):
-        return []
+    # Make lines still buffered by the writer visible to this read
+    flush_structured_logs()
     
     try:
-        logs = []
-        with open(log_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    log_entry = json.loads(line.strip())
-                    if filter_func is None or filter_func(log_entry):
-                        logs.append(log_entry)
-                        if len(logs) >= limit:
-                            break
-                except json.JSONDecodeError:
-                    continue
-        return logs
+        return _read_logs(LOG_TYPES[log_type], limit, filter_func, tail)
     except Exception as e:
         logger.error(f"Failed to read structured logs: {str(e)}")
         return []
 
+def _metric_in_window(metric: Dict[str, Any], metric_name: str, time_threshold: float) -> bool:
+    """Whether a logged metric entry has the given name and is recent enough"""
+    if metric.get('metric_name') != metric_name:
+        return False
+    metric_time = metric.get('timestamp_epoch')
+    if metric_time is None:
+        # Entries written before timestamp_epoch existed
+        try:
+            metric_time = datetime.fromisoformat(metric['timestamp'].replace('Z', '+00:00')).timestamp()
+        except (KeyError, ValueError):
+            return False
+    return metric_time >= time_threshold
+
 def aggregate_metrics(metric_name: str, time_window_minutes: int = 60) -> Dict[str, Any]:
     """Aggregate performance metrics over a time window
     
@@ -375,23 +816,49 @@ def aggregate_metrics(metric_name: str, time_window_minutes: int = 60) -> Dict[s
         Dict[str, Any]: Aggregated metrics
     """
     # Calculate time threshold
-    time_threshold = datetime.now().timestamp() - (time_window_minutes * 60)
-    
-    # Get performance metrics
-    metrics = get_structured_logs('performance_metrics')
-    
-    # Filter by metric name and time window
-    filtered_metrics = []
-    for metric in metrics:
+    time_threshold = time.time() - (time_window_minutes * 60)
+    
+    # The in-memory samples cover the window if this process has been
+    # recording since before it started and none of it was evicted
+    recent = tuple(_recent_metrics)
+    if len(recent) == RECENT_METRICS_SIZE:
+        covered = recent[0][0] <= time_threshold
+    else:
+        covered = _recent_metrics_since <= time_threshold
+    
+    if covered:
+        values = (value for ts, name, value in recent
+                  if name == metric_name and ts >= time_threshold)
+    else:
+        # Cold start: read the log files, newest entries first, skipping
+        # rotated files that were complete before the window started
+        flush_structured_logs()
         try:
-            metric_time = datetime.fromisoformat(metric['timestamp'].replace('Z', '+00:00')).timestamp()
-            if metric['metric_name'] == metric_name and metric_time >= time_threshold:
-                filtered_metrics.append(metric)
-        except (KeyError, ValueError):
-            continue
-    
-    # Calculate aggregates
-    if not filtered_metrics:
+            entries = _read_logs(
+                LOG_TYPES['performance_metrics'], RECENT_METRICS_SIZE,
+                lambda m: _metric_in_window(m, metric_name, time_threshold),
+                tail=True, since=time_threshold
+            )
+        except Exception as e:
+            logger.error(f"Failed to read structured logs: {str(e)}")
+            entries = []
+        values = (m['value'] for m in entries if 'value' in m)
+    
+    # Calculate aggregates in one pass without materializing the values
+    count = 0
+    total = 0
+    lowest = highest = None
+    for value in values:
+        if count == 0:
+            lowest = highest = value
+        elif value < lowest:
+            lowest = value
+        elif value > highest:
+            highest = value
+        total += value
+        count += 1
+    
+    if not count:
         return {
             'metric_name': metric_name,
             'count': 0,
@@ -401,13 +868,11 @@ def aggregate_metrics(metric_name: str, time_window_minutes: int = 60) -> Dict[s
             'time_window_minutes': time_window_minutes
         }
     
-    values = [m['value'] for m in filtered_metrics if 'value' in m]
-    
     return {
         'metric_name': metric_name,
-        'count': len(values),
-        'min': min(values) if values else None,
-        'max': max(values) if values else None,
-        'avg': sum(values) / len(values) if values else None,
+        'count': count,
+        'min': lowest,
+        'max': highest,
+        'avg': total / count,
         'time_window_minutes': time_window_minutes
     }
\ No newline at end of file
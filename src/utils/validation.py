@@ -5,6 +5,7 @@ error handling, and data sanitization to ensure data integrity and security.
 """
 
 import re
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Any, Optional, Union, Callable
 from datetime import datetime
@@ -33,6 +34,16 @@ from src.utils.logging import get_app_logger
 
 logger = get_app_logger(__name__)
 
+# Characters stripped from user input by sanitize_input
+_SANITIZE_TABLE = str.maketrans('', '', '<>"\\')
+
+# Patterns used on every password/email call, compiled once
+_RE_UPPER = re.compile(r'[A-Z]')
+_RE_LOWER = re.compile(r'[a-z]')
+_RE_DIGIT = re.compile(r'\d')
+_RE_SPECIAL = re.compile(r'[!@#$%^&*(),.?":{}|<>]')
+_RE_EMAIL_PART = re.compile(r'[\w.-]+')
+
 class ValidationResult:
     """Result of a validation operation"""
     
@@ -55,6 +66,22 @@ class DataValidator:
         """Validate data and return result"""
         raise NotImplementedError("Subclasses must implement validate()")
 
+def _make_type_check(expected_type: Union[type, tuple]) -> Callable[[Any], bool]:
+    """Build an isinstance(value, expected_type) check that answers values of
+    exactly an expected type with one set lookup, falling back to isinstance
+    for subclasses"""
+    exact_types = frozenset(expected_type if isinstance(expected_type, tuple) else (expected_type,))
+    
+    def check(value) -> bool:
+        return type(value) in exact_types or isinstance(value, expected_type)
+    return check
+
+def _type_name(expected_type: Union[type, tuple]) -> str:
+    """Readable name of a type or tuple of types for error messages"""
+    if isinstance(expected_type, tuple):
+        return ' or '.join(t.__name__ for t in expected_type)
+    return expected_type.__name__
+
 class SchemaValidator(DataValidator):
     """Validator for checking data schema"""
     
@@ -70,6 +97,12 @@ class SchemaValidator(DataValidator):
                 - validators: Optional list of validation functions
         """
         self.schema = schema
+        # Field name -> (type check, expected type name), built once per schema
+        self._type_checks = {
+            field_name: (_make_type_check(field_rules['type']), _type_name(field_rules['type']))
+            for field_name, field_rules in schema.items()
+            if field_rules.get('type')
+        }
     
     def validate(self, data: Dict[str, Any]) -> ValidationResult:
         """Validate data against schema"""
@@ -86,9 +119,10 @@ class SchemaValidator(DataValidator):
                 field_rules = self.schema[field_name]
                 
                 # Type validation
-                expected_type = field_rules.get('type')
-                if expected_type and not isinstance(field_value, expected_type):
-                    errors.append(f"Field {field_name} should be of type {expected_type.__name__}")
+                type_check = self._type_checks.get(field_name)
+                if type_check and not type_check[0](field_value):
+                    errors.append(f"Field {field_name} should be of type {type_check[1]}")
+                    continue
                 
                 # Custom validators
                 validators = field_rules.get('validators', [])
@@ -99,6 +133,19 @@ class SchemaValidator(DataValidator):
         
         return ValidationResult(len(errors) == 0, errors)
 
+# Python type every value of a numpy column of this dtype kind converts to
+_DTYPE_KIND_TYPES = {'i': int, 'u': int, 'f': float, 'b': bool}
+
+def _column_value_types(series: pd.Series) -> set:
+    """Distinct Python types of a column's values, as Series.apply would see them
+    
+    Plain numpy integer, float and bool columns are answered from the dtype
+    alone; other columns are walked once with the builtin type().
+    """
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in _DTYPE_KIND_TYPES:
+        return {_DTYPE_KIND_TYPES[series.dtype.kind]}
+    return set(map(type, series.astype(object)))
+
 class DataFrameValidator(DataValidator):
     """Validator for pandas DataFrames"""
     
@@ -110,7 +157,11 @@ class DataFrameValidator(DataValidator):
         Args:
             required_columns: List of columns that must be present
             column_types: Optional mapping of column names to expected types
-            custom_validators: Optional mapping of column names to validator functions
+            custom_validators: Optional mapping of column names to validator functions.
+                Each receives the whole column as a Series and returns an
+                (is_valid, message) tuple; validate_range works on Series
+                directly, and scalar validators can be adapted with
+                scalar_to_vector
         """
         self.required_columns = required_columns
         self.column_types = column_types or {}
@@ -127,10 +178,10 @@ class DataFrameValidator(DataValidator):
         
         # Check column types
         for col, expected_type in self.column_types.items():
-            if col in df.columns:
+            if col in df.columns and not df[col].empty:
                 # Check if any values in the column are not of the expected type
-                invalid_values = df[~df[col].apply(lambda x: isinstance(x, expected_type))]
-                if not invalid_values.empty:
+                value_types = _column_value_types(df[col])
+                if not all(issubclass(value_type, expected_type) for value_type in value_types):
                     errors.append(f"Column {col} contains values of incorrect type. Expected {expected_type.__name__}")
         
         # Run custom validators
@@ -146,10 +197,38 @@ class DataFrameValidator(DataValidator):
         
         return ValidationResult(len(errors) == 0, errors)
 
+def scalar_to_vector(func: Callable) -> Callable:
+    """Adapt a scalar (is_valid, message) validator to take a whole Series
+    
+    The scalar validator runs over the column through numpy.frompyfunc, and
+    the first failure's message is reported with the number of failures.
+    """
+    apply = np.frompyfunc(func, 1, 1)
+    def validator(series):
+        # NaN comparisons inside scalar validators are expected, not errors
+        with np.errstate(invalid='ignore'):
+            results = apply(series.to_numpy(dtype=object))
+        valid = np.fromiter((result[0] for result in results), dtype=bool, count=len(results))
+        if valid.all():
+            return True, ""
+        invalid_positions = np.flatnonzero(~valid)
+        return False, f"{len(invalid_positions)} invalid values, first: {results[invalid_positions[0]][1]}"
+    return validator
+
 # Common validation functions
 def validate_range(min_val: Optional[float] = None, max_val: Optional[float] = None):
-    """Create a validator function that checks if a value is within a range"""
+    """Create a validator function that checks if a value is within a range
+    
+    The validator accepts a scalar or a pandas Series; a Series is checked
+    with vectorized comparisons.
+    """
     def validator(value):
+        if isinstance(value, pd.Series):
+            if min_val is not None and (value < min_val).any():
+                return False, f"{int((value < min_val).sum())} values are less than minimum {min_val}"
+            if max_val is not None and (value > max_val).any():
+                return False, f"{int((value > max_val).sum())} values are greater than maximum {max_val}"
+            return True, ""
         if min_val is not None and value < min_val:
             return False, f"Value {value} is less than minimum {min_val}"
         if max_val is not None and value > max_val:
@@ -224,20 +303,14 @@ def sanitize_input(input_str: str) -> str:
         return str(input_str) if input_str is not None else ""
     
     # Remove potentially dangerous characters
-    sanitized = re.sub(r'[<>"\\\\]', '', input_str)
-    return sanitized
+    return input_str.translate(_SANITIZE_TABLE)
 
 def sanitize_dict(data: Dict) -> Dict:
     """Sanitize all string values in a dictionary"""
-    sanitized_data = {}
-    
-    for key, value in data.items():
-        if isinstance(value, str):
-            sanitized_data[key] = sanitize_input(value)
-        else:
-            sanitized_data[key] = value
-    
-    return sanitized_data
+    return {
+        key: value.translate(_SANITIZE_TABLE) if isinstance(value, str) else value
+        for key, value in data.items()
+    }
 
 # Password validation
 def validate_password_strength(password: str) -> ValidationResult:
@@ -255,28 +328,36 @@ def validate_password_strength(password: str) -> ValidationResult:
     if len(password) < 8:
         errors.append("Password must be at least 8 characters long")
     
-    if not re.search(r'[A-Z]', password):
+    if not _RE_UPPER.search(password):
         errors.append("Password must contain at least one uppercase letter")
     
-    if not re.search(r'[a-z]', password):
+    if not _RE_LOWER.search(password):
         errors.append("Password must contain at least one lowercase letter")
     
-    if not re.search(r'\d', password):
+    if not _RE_DIGIT.search(password):
         errors.append("Password must contain at least one digit")
     
-    if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+    if not _RE_SPECIAL.search(password):
         errors.append("Password must contain at least one special character")
     
     return ValidationResult(len(errors) == 0, errors)
 
 # Email validation
 def validate_email(email: str) -> ValidationResult:
-    """Validate email format"""
+    """Validate email format
+    
+    Accepts local@host.tld where local and host are word characters, dots
+    and hyphens and tld is at least two ASCII letters. The address is split
+    at '@' and the last '.', so each part is scanned once and long inputs
+    cannot make the check backtrack.
+    """
     if not email:
         return ValidationResult(False, ["Email cannot be empty"])
     
-    email_pattern = r'^[\w\.-]+@[\w\.-]+\.[a-zA-Z]{2,}$'
-    if not re.match(email_pattern, email):
+    local, at, domain = email.partition('@')
+    host, dot, tld = domain.rpartition('.')
+    if not (at and dot and len(tld) >= 2 and tld.isascii() and tld.isalpha()
+            and _RE_EMAIL_PART.fullmatch(local) and _RE_EMAIL_PART.fullmatch(host)):
         return ValidationResult(False, ["Invalid email format"])
     
     return ValidationResult(True)
@@ -291,7 +372,11 @@ def validate_date_format(date_str: str, format_str: str = '%Y-%m-%d') -> Validat
         return ValidationResult(False, [f"Invalid date format. Expected format: {format_str}"])
 
 # Example usage
+_credit_score_validator: Optional[SchemaValidator] = None
+
 def validate_credit_score_input(data: Dict[str, Any]) -> ValidationResult:
     """Validate credit score input data"""
-    validator = create_credit_score_validator()
-    return validator.validate(data)
\ No newline at end of file
+    global _credit_score_validator
+    if _credit_score_validator is None:
+        _credit_score_validator = create_credit_score_validator()
+    return _credit_score_validator.validate(data)
\ No newline at end of file
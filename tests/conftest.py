@@ -0,0 +1,15 @@
+import pytest
+
+# Tests that fit or explain a model; run them with -m slow, skip them with -m "not slow"
+SLOW_TESTS = {'test_fit', 'test_explain', 'test_explain_instance', 'test_predict_batch'}
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: tests that start external processes or fit models")
+
+
+def pytest_collection_modifyitems(config, items):
+    for item in items:
+        if item.name.split('[')[0] in SLOW_TESTS:
+            item.add_marker(pytest.mark.slow)
+
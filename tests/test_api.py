@@ -1,32 +1,47 @@
 import os
-import sys
+import asyncio
 import unittest
 import json
-from fastapi.testclient import TestClient
-
-# Add project root to path
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import time
+import httpx
+import pytest
 
 from src.serve.api import app
 
+# Batch sizes for the scaling test and how much the per-item latency of the
+# largest batch may exceed that of the smallest
+BATCH_SIZES = (2, 50, 100)
+BATCH_LATENCY_TOLERANCE = float(os.environ.get("BATCH_LATENCY_TOLERANCE", "5"))
 
-class TestCredTechAPI(unittest.TestCase):
-    """Test cases for the CredTech XScore API endpoints"""
 
-    def setUp(self):
-        """Set up test client and authentication"""
-        self.client = TestClient(app)
-        # Get authentication token
-        response = self.client.post(
-            "/api/token",
-            data={"username": "johndoe", "password": "secret"}
-        )
-        self.token = response.json()["access_token"]
-        self.headers = {"Authorization": f"Bearer {self.token}"}
+class TestCredTechAPI(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the CredTech XScore API endpoints"""
 
-    def test_health_check(self):
+    @classmethod
+    def setUpClass(cls):
+        """Fetch one access token shared by every test"""
+        cls.token = asyncio.run(cls._fetch_token())
+        cls.headers = {"Authorization": f"Bearer {cls.token}"}
+
+    @staticmethod
+    async def _fetch_token():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(
+                "/api/token",
+                data={"username": "johndoe", "password": "secret"}
+            )
+        return response.json()["access_token"]
+
+    async def asyncSetUp(self):
+        """Set up an in-process async client"""
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def test_health_check(self):
         """Test the health check endpoint"""
-        response = self.client.get("/api/health")
+        response = await self.client.get("/api/health")
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertEqual(data["status"], "OK")
@@ -34,10 +49,10 @@ class TestCredTechAPI(unittest.TestCase):
         self.assertIn("model_loaded", data)
         self.assertIn("timestamp", data)
 
-    def test_authentication(self):
+    async def test_authentication(self):
         """Test authentication endpoints"""
         # Test successful authentication
-        response = self.client.post(
+        response = await self.client.post(
             "/api/token",
             data={"username": "johndoe", "password": "secret"}
         )
@@ -47,23 +62,23 @@ class TestCredTechAPI(unittest.TestCase):
         self.assertEqual(data["token_type"], "bearer")
 
         # Test failed authentication
-        response = self.client.post(
+        response = await self.client.post(
             "/api/token",
             data={"username": "johndoe", "password": "wrong_password"}
         )
         self.assertEqual(response.status_code, 401)
 
-    def test_protected_endpoint_without_token(self):
+    async def test_protected_endpoint_without_token(self):
         """Test accessing protected endpoint without token"""
-        response = self.client.get("/api/issuers")
+        response = await self.client.get("/api/issuers")
         self.assertEqual(response.status_code, 401)
 
-    def test_protected_endpoint_with_token(self):
+    async def test_protected_endpoint_with_token(self):
         """Test accessing protected endpoint with token"""
-        response = self.client.get("/api/issuers", headers=self.headers)
+        response = await self.client.get("/api/issuers", headers=self.headers)
         self.assertEqual(response.status_code, 200)
 
-    def test_credit_score_endpoint(self):
+    async def test_credit_score_endpoint(self):
         """Test the credit score endpoint"""
         test_data = {
             "issuer": "Apple Inc.",
@@ -72,7 +87,7 @@ class TestCredTechAPI(unittest.TestCase):
             "transactions": 1250,
             "news_sentiment": 0.75
         }
-        response = self.client.post(
+        response = await self.client.post(
             "/api/score",
             json=test_data,
             headers=self.headers
@@ -86,7 +101,7 @@ class TestCredTechAPI(unittest.TestCase):
         self.assertIsInstance(data["explanation"], dict)
         self.assertIn("timestamp", data)
 
-    def test_batch_score_endpoint(self):
+    async def test_batch_score_endpoint(self):
         """Test the batch score endpoint"""
         test_data = {
             "items": [
@@ -106,7 +121,7 @@ class TestCredTechAPI(unittest.TestCase):
                 }
             ]
         }
-        response = self.client.post(
+        response = await self.client.post(
             "/api/batch-score",
             json=test_data,
             headers=self.headers
@@ -118,7 +133,47 @@ class TestCredTechAPI(unittest.TestCase):
         self.assertEqual(data["count"], 2)
         self.assertIn("timestamp", data)
 
-    def test_validation_error(self):
+        # Score the same issuers individually, concurrently
+        responses = await asyncio.gather(*(
+            self.client.post("/api/score", json=item, headers=self.headers)
+            for item in test_data["items"]
+        ))
+        for item, response in zip(test_data["items"], responses):
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["issuer"], item["issuer"])
+
+    @pytest.mark.slow
+    async def test_batch_score_scales_linearly(self):
+        """Test that per-item batch latency does not grow with the batch size"""
+        per_item = {}
+        # The endpoint caps batches at 100 items
+        for n in BATCH_SIZES:
+            with self.subTest(n=n):
+                items = [
+                    {
+                        "issuer": f"X{i}",
+                        "income": 1e6 + i,
+                        "balance": 2e5,
+                        "transactions": 100 + i,
+                        "news_sentiment": 0.1
+                    }
+                    for i in range(n)
+                ]
+                t0 = time.perf_counter()
+                response = await self.client.post(
+                    "/api/batch-score",
+                    json={"items": items},
+                    headers=self.headers
+                )
+                per_item[n] = (time.perf_counter() - t0) / n
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()["count"], n)
+
+        # A quadratic loop makes the largest batch's per-item cost grow ~n-fold
+        smallest, largest = min(per_item), max(per_item)
+        self.assertLess(per_item[largest], per_item[smallest] * BATCH_LATENCY_TOLERANCE)
+
+    async def test_validation_error(self):
         """Test validation error handling"""
         # Test with invalid data (negative income)
         test_data = {
@@ -128,7 +183,7 @@ class TestCredTechAPI(unittest.TestCase):
             "transactions": 1250,
             "news_sentiment": 0.75
         }
-        response = self.client.post(
+        response = await self.client.post(
             "/api/score",
             json=test_data,
             headers=self.headers
@@ -137,9 +192,9 @@ class TestCredTechAPI(unittest.TestCase):
         data = response.json()
         self.assertIn("detail", data)
 
-    def test_model_info_endpoint(self):
+    async def test_model_info_endpoint(self):
         """Test the model info endpoint"""
-        response = self.client.get("/api/model-info", headers=self.headers)
+        response = await self.client.get("/api/model-info", headers=self.headers)
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertIn("name", data)
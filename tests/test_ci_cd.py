@@ -1,16 +1,28 @@
 """Tests for CI/CD pipeline components"""
 
+import mmap
 import os
+import shutil
 import unittest
 import subprocess
-from unittest.mock import patch, MagicMock
+from typing import List
+
+import pytest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts")
+
+
+def _script_cmd(script: str, *args: str) -> List[str]:
+    """Build the argv that runs a deployment script under bash"""
+    return ["bash", os.path.join(SCRIPTS_DIR, script), *args]
+
 
 class TestCICD(unittest.TestCase):
     """Test cases for CI/CD pipeline components"""
     
     def test_deployment_scripts_exist(self):
         """Test that deployment scripts exist"""
-        scripts_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts")
+        scripts_dir = SCRIPTS_DIR
         
         # Check that required scripts exist
         self.assertTrue(os.path.exists(os.path.join(scripts_dir, "prepare_deployment.sh")))
@@ -19,45 +31,17 @@ class TestCICD(unittest.TestCase):
         self.assertTrue(os.path.exists(os.path.join(scripts_dir, "health_check.sh")))
         self.assertTrue(os.path.exists(os.path.join(scripts_dir, "check_deployment.sh")))
     
-    @patch('subprocess.run')
-    def test_health_check_script(self, mock_run):
-        """Test health check script execution"""
-        # Mock successful response
-        mock_process = MagicMock()
-        mock_process.returncode = 0
-        mock_run.return_value = mock_process
-        
-        # Run health check script
-        scripts_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts")
-        health_check_script = os.path.join(scripts_dir, "health_check.sh")
-        
-        # Test with default parameters
-        result = subprocess.run(["bash", health_check_script, "--url", "http://localhost:8000/api/health"], 
-                               capture_output=True, text=True)
-        
-        # Assert script was called
-        mock_run.assert_called()
-    
-    @patch('subprocess.run')
-    def test_deploy_script(self, mock_run):
-        """Test deploy script execution"""
-        # Mock successful response
-        mock_process = MagicMock()
-        mock_process.returncode = 0
-        mock_run.return_value = mock_process
-        
-        # Run deploy script
-        scripts_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts")
-        deploy_script = os.path.join(scripts_dir, "deploy.sh")
-        
-        # Test with parameters
-        result = subprocess.run(["bash", deploy_script, 
-                               "--environment", "staging", 
-                               "--tag", "latest"], 
-                               capture_output=True, text=True)
-        
-        # Assert script was called
-        mock_run.assert_called()
+    @pytest.mark.slow
+    @unittest.skipUnless(shutil.which("bash"), "bash is not available")
+    def test_scripts_run_under_bash(self):
+        """Test that the scripts parse their arguments under a real shell"""
+        # --help exits before any network or docker calls are made
+        for script in ("health_check.sh", "deploy.sh"):
+            with self.subTest(script=script):
+                result = subprocess.run(_script_cmd(script, "--help"),
+                                        capture_output=True, text=True, timeout=30)
+                self.assertEqual(result.returncode, 0)
+                self.assertIn("Usage:", result.stdout)
     
     def test_ci_workflow_file_exists(self):
         """Test that CI workflow file exists"""
@@ -67,15 +51,16 @@ class TestCICD(unittest.TestCase):
         )
         self.assertTrue(os.path.exists(workflow_file))
         
-        # Check content of workflow file
-        with open(workflow_file, 'r') as f:
-            content = f.read()
-            
+        # Scan the workflow file once for the required jobs
+        needed = {b"test:", b"build-and-push:", b"deploy-staging:", b"deploy-production:"}
+        with open(workflow_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b''):
+                needed.difference_update([job for job in needed if job in line])
+                if not needed:
+                    break
+        
         # Check for required jobs
-        self.assertIn("test:", content)
-        self.assertIn("build-and-push:", content)
-        self.assertIn("deploy-staging:", content)
-        self.assertIn("deploy-production:", content)
+        self.assertEqual(needed, set(), "missing jobs: {}".format(sorted(needed)))
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,59 +1,94 @@
 import os
-import sys
 import unittest
 import pandas as pd
 import numpy as np
 import joblib
 from sklearn.preprocessing import StandardScaler
 
-# Add project root to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from src.model.trainer import CreditScoreModel
 
 class TestCreditScoreModel(unittest.TestCase):
     """Test cases for the CreditScoreModel class"""
     
-    def setUp(self):
-        """Set up test fixtures"""
-        # Create a sample DataFrame for testing
-        self.sample_data = pd.DataFrame({
-            'issuer': ['ABC', 'XYZ', 'LMN', 'QRS', 'ABC'],
-            'asof_date': ['2023-01-15', '2023-02-20', '2023-03-25', '2023-04-30', '2023-05-05'],
-            'income': [75000, 120000, 45000, 90000, 60000],
-            'balance': [15000, 30000, 5000, 20000, 10000],
-            'transactions': [12, 25, 8, 15, 10],
-            'data_source': ['test', 'test', 'test', 'test', 'test'],
-            'month': [1, 2, 3, 4, 5],
-            'day_of_week': [6, 1, 5, 0, 5],
-            'day_of_month': [15, 20, 25, 30, 5],
-            'balance_to_income': [0.2, 0.25, 0.11, 0.22, 0.17],
-            'transactions_to_income': [0.00016, 0.00021, 0.00018, 0.00017, 0.00017],
-            'issuer_ABC': [1, 0, 0, 0, 1],
-            'issuer_XYZ': [0, 1, 0, 0, 0],
-            'issuer_LMN': [0, 0, 1, 0, 0],
-            'issuer_QRS': [0, 0, 0, 1, 0],
-            'news_sentiment_neg': [0.1, 0.4, 0.2, 0.3, 0.2],
-            'news_sentiment_pos': [0.6, 0.1, 0.4, 0.3, 0.5],
-            'news_sentiment_neu': [0.3, 0.5, 0.4, 0.4, 0.3],
-            'news_sentiment_compound': [0.5, -0.3, 0.2, 0.0, 0.3],
-            'target': [1, 0, 1, 0, 1]  # Binary target for classification
-        })
-        
-        # Convert date strings to datetime objects
-        self.sample_data['asof_date'] = pd.to_datetime(self.sample_data['asof_date'])
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by all tests"""
+        # Create a sample DataFrame for testing from one structured array
+        issuers = np.array(['ABC', 'XYZ', 'LMN', 'QRS'])
+        issuer_idx = np.array([0, 1, 2, 3, 0])
+        records = np.array([
+            # income, balance, transactions, month, day_of_week, day_of_month,
+            # balance_to_income, transactions_to_income, news_sentiment_neg/pos/neu/compound, target
+            (75000, 15000, 12, 1, 6, 15, 0.2, 0.00016, 0.1, 0.6, 0.3, 0.5, 1),
+            (120000, 30000, 25, 2, 1, 20, 0.25, 0.00021, 0.4, 0.1, 0.5, -0.3, 0),
+            (45000, 5000, 8, 3, 5, 25, 0.11, 0.00018, 0.2, 0.4, 0.4, 0.2, 1),
+            (90000, 20000, 15, 4, 0, 30, 0.22, 0.00017, 0.3, 0.3, 0.4, 0.0, 0),
+            (60000, 10000, 10, 5, 5, 5, 0.17, 0.00017, 0.2, 0.5, 0.3, 0.3, 1),
+        ], dtype=[('income', 'i8'), ('balance', 'i8'), ('transactions', 'i8'),
+                  ('month', 'i8'), ('day_of_week', 'i8'), ('day_of_month', 'i8'),
+                  ('balance_to_income', 'f8'), ('transactions_to_income', 'f8'),
+                  ('news_sentiment_neg', 'f8'), ('news_sentiment_pos', 'f8'),
+                  ('news_sentiment_neu', 'f8'), ('news_sentiment_compound', 'f8'),
+                  ('target', 'i8')])  # Binary target for classification
+        numeric = pd.DataFrame.from_records(records)
+        
+        # One-hot issuer columns from a single identity matrix lookup
+        one_hot = pd.DataFrame(np.eye(len(issuers), dtype='i8')[issuer_idx],
+                               columns=['issuer_' + name for name in issuers])
+        
+        sample_data = pd.concat([numeric, one_hot], axis=1)
+        sample_data.insert(0, 'issuer', issuers[issuer_idx])
+        # Dates are parsed once, straight into datetime64
+        sample_data.insert(1, 'asof_date', pd.to_datetime(
+            ['2023-01-15', '2023-02-20', '2023-03-25', '2023-04-30', '2023-05-05']))
+        sample_data.insert(5, 'data_source', 'test')
+        
+        # Keep the column order of the original fixture
+        cls.sample_data = sample_data[[
+            'issuer', 'asof_date', 'income', 'balance', 'transactions', 'data_source',
+            'month', 'day_of_week', 'day_of_month', 'balance_to_income',
+            'transactions_to_income', 'issuer_ABC', 'issuer_XYZ', 'issuer_LMN', 'issuer_QRS',
+            'news_sentiment_neg', 'news_sentiment_pos', 'news_sentiment_neu',
+            'news_sentiment_compound', 'target'
+        ]]
+        
+        # Model inputs: the sample data without the target
+        cls.features = cls.sample_data.drop(columns=['target'])
         
         # Define feature lists
-        self.categorical_features = ['issuer_ABC', 'issuer_XYZ', 'issuer_LMN', 'issuer_QRS']
-        self.numerical_features = ['income', 'balance', 'transactions', 'month', 'day_of_week', 
+        cls.categorical_features = ['issuer_ABC', 'issuer_XYZ', 'issuer_LMN', 'issuer_QRS']
+        cls.numerical_features = ['income', 'balance', 'transactions', 'month', 'day_of_week', 
                                   'day_of_month', 'balance_to_income', 'transactions_to_income',
                                   'news_sentiment_neg', 'news_sentiment_pos', 'news_sentiment_neu', 
                                   'news_sentiment_compound']
         
-        # Initialize the model
-        self.model = CreditScoreModel()
-        self.model.categorical_features = self.categorical_features
-        self.model.numerical_features = self.numerical_features
+        # Model fitted on first use by _fitted_model() and then shared
+        cls._fitted = None
+    
+    @classmethod
+    def _new_model(cls):
+        model = CreditScoreModel()
+        model.categorical_features = cls.categorical_features
+        model.numerical_features = cls.numerical_features
+        return model
+    
+    @classmethod
+    def _fitted_model(cls):
+        """Model fitted on the sample data, shared by tests that do not modify it"""
+        if cls._fitted is None:
+            model = cls._new_model()
+            data = cls.sample_data.copy()
+            # A random split keeps both classes in the 2-row test set
+            model.train(data.drop(columns=['target']), data['target'],
+                        categorical_features=cls.categorical_features,
+                        numerical_features=cls.numerical_features,
+                        test_size=0.4, time_split=False)
+            cls._fitted = model
+        return cls._fitted
+    
+    def setUp(self):
+        """Set up a fresh, unfitted model"""
+        self.model = self._new_model()
     
     def test_initialization(self):
         """Test that the model initializes correctly"""
@@ -80,14 +115,14 @@ class TestCreditScoreModel(unittest.TestCase):
     
     def test_predict(self):
         """Test the predict method"""
-        # Fit the model
-        self.model.fit(self.sample_data)
+        # Use the model fitted once for the whole class
+        model = self._fitted_model()
         
         # Create test data (first 2 rows of sample data)
-        test_data = self.sample_data.iloc[:2].copy()
+        test_data = self.features.iloc[:2].copy()
         
         # Make predictions
-        predictions = self.model.predict(test_data)
+        predictions = model.predict(test_data)
         
         # Check that predictions were returned
         self.assertIsNotNone(predictions)
@@ -96,16 +131,37 @@ class TestCreditScoreModel(unittest.TestCase):
         # Check that predictions are between 0 and 1 (probabilities)
         self.assertTrue(all(0 <= p <= 1 for p in predictions))
     
+    def test_predict_batch(self):
+        """Test that one batched predict call matches predicting row by row"""
+        # Use the model fitted once for the whole class
+        model = self._fitted_model()
+        
+        # Predict each sample row on its own
+        single_predictions = np.concatenate([
+            np.asarray(model.predict(self.features.iloc[[i]].copy()))
+            for i in range(len(self.features))
+        ])
+        
+        for batch_size in (1, 2, 5):
+            with self.subTest(batch_size=batch_size):
+                batched = pd.concat([self.features] * batch_size, ignore_index=True)
+                
+                # Make predictions for the whole batch in one call
+                predictions = model.predict(batched)
+                
+                self.assertEqual(len(predictions), len(batched))
+                np.testing.assert_allclose(predictions, np.tile(single_predictions, batch_size))
+    
     def test_explain(self):
         """Test the explain method"""
-        # Fit the model
-        self.model.fit(self.sample_data)
+        # Use the model fitted once for the whole class
+        model = self._fitted_model()
         
         # Create test data (first 2 rows of sample data)
         test_data = self.sample_data.iloc[:2].copy()
         
         # Get explanations
-        explanations = self.model.explain(test_data)
+        explanations = model.explain(test_data)
         
         # Check that explanations were returned
         self.assertIsNotNone(explanations)
@@ -120,14 +176,14 @@ class TestCreditScoreModel(unittest.TestCase):
     
     def test_explain_instance(self):
         """Test the explain_instance method"""
-        # Fit the model
-        self.model.fit(self.sample_data)
+        # Use the model fitted once for the whole class
+        model = self._fitted_model()
         
         # Create test data (first row of sample data)
         test_instance = self.sample_data.iloc[0].copy()
         
         # Get explanation
-        explanation = self.model.explain_instance(test_instance)
+        explanation = model.explain_instance(test_instance)
         
         # Check that explanation was returned
         self.assertIsNotNone(explanation)
@@ -149,30 +205,31 @@ class TestCreditScoreModel(unittest.TestCase):
         """Test saving and loading the model"""
         # Create a temporary directory for testing
         import tempfile
-        temp_dir = tempfile.mkdtemp()
-        temp_file = os.path.join(temp_dir, 'model.joblib')
-        
-        # Fit the model
-        self.model.fit(self.sample_data)
-        
-        # Save the model
-        self.model.save(temp_file)
-        
-        # Create a new model
-        new_model = CreditScoreModel()
-        
-        # Load the model
-        new_model.load(temp_file)
-        
-        # Check that the model was loaded correctly
-        self.assertIsNotNone(new_model.model)
-        self.assertIsNotNone(new_model.scaler)
-        self.assertEqual(new_model.categorical_features, self.categorical_features)
-        self.assertEqual(new_model.numerical_features, self.numerical_features)
-        
-        # Clean up
-        os.remove(temp_file)
-        os.rmdir(temp_dir)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_file = os.path.join(temp_dir, 'model.joblib')
+            
+            # Use the model fitted once for the whole class
+            model = self._fitted_model()
+            
+            # Save the model
+            model.save(temp_file)
+            
+            # Create a new model
+            new_model = CreditScoreModel()
+            
+            # Load the model, memory-mapping its arrays
+            new_model.load(temp_file, mmap_mode='r')
+            
+            # Check that the model was loaded correctly
+            self.assertIsNotNone(new_model.model)
+            self.assertIsNotNone(new_model.scaler)
+            self.assertEqual(new_model.categorical_features, self.categorical_features)
+            self.assertEqual(new_model.numerical_features, self.numerical_features)
+            
+            # Check that the memory-mapped model predicts like the original
+            np.testing.assert_allclose(new_model.predict(self.features),
+                                       model.predict(self.features))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
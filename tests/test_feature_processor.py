@@ -1,13 +1,9 @@
 import os
-import sys
 import unittest
 import pandas as pd
 import numpy as np
 from datetime import datetime
 
-# Add project root to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from src.features.processor import FeatureProcessor
 
 class TestFeatureProcessor(unittest.TestCase):
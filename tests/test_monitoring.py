@@ -33,11 +33,11 @@ class TestMetricsCollector(unittest.TestCase):
         endpoint = "/api/test"
         response_time = 0.5
         self.collector.record_response_time(endpoint, response_time)
-        self.assertEqual(self.collector.response_times[endpoint], [response_time])
+        self.assertEqual(self.collector.avg_response_times[endpoint], response_time)
         
         # Record another response time
         self.collector.record_response_time(endpoint, response_time * 2)
-        self.assertEqual(self.collector.response_times[endpoint], [response_time, response_time * 2])
+        self.assertEqual(self.collector.avg_response_times[endpoint], response_time * 1.5)
     
     def test_record_error(self):
         """Test recording an error"""
@@ -49,7 +49,7 @@ class TestMetricsCollector(unittest.TestCase):
         self.collector.record_error(endpoint)
         self.assertEqual(self.collector.error_counts[endpoint], 2)
     
-    @patch('psutil.cpu_percent')
+    @patch('src.utils.monitoring.cpu_sampler.get')
     @patch('psutil.virtual_memory')
     @patch('psutil.disk_usage')
     def test_collect_system_metrics(self, mock_disk_usage, mock_virtual_memory, mock_cpu_percent):
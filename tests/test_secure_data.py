@@ -0,0 +1,67 @@
+"""Tests for secure data handling utilities"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.utils.error_handling import DataError
+from src.utils.secure_data import secure_save_many, secure_load_json
+
+
+class TestSecureSaveMany(unittest.TestCase):
+    """Test batched saving with secure_save_many"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.records = {
+            os.path.join(self.temp_dir.name, f"record_{i}.json"): {"id": i, "score": i * 0.5}
+            for i in range(5)
+        }
+        # Put one record in a subdirectory so more than one directory is synced
+        self.records[os.path.join(self.temp_dir.name, "nested", "record.json")] = {"id": 99}
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        self.temp_dir.cleanup()
+    
+    def _assert_round_trip(self):
+        for path, data in self.records.items():
+            self.assertEqual(secure_load_json(path), data)
+        leftovers = [name for _, _, names in os.walk(self.temp_dir.name)
+                     for name in names if name.endswith('.tmp')]
+        self.assertEqual(leftovers, [])
+    
+    def test_save_many_encrypted(self):
+        """Test saving several encrypted files and loading them back"""
+        secure_save_many(list(self.records.items()))
+        self._assert_round_trip()
+    
+    def test_save_many_binary(self):
+        """Test saving several binary AES-GCM files and loading them back"""
+        secure_save_many(list(self.records.items()), binary=True)
+        self._assert_round_trip()
+        for path in self.records:
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(1), b'\x01')
+    
+    def test_save_many_plain(self):
+        """Test saving several unencrypted files and loading them back"""
+        secure_save_many(list(self.records.items()), encrypt=False)
+        self._assert_round_trip()
+    
+    def test_save_many_failure_leaves_targets_untouched(self):
+        """Test that a failed batch replaces no file and removes its temporary files"""
+        secure_save_many(list(self.records.items()))
+        
+        updated = [(path, {"id": -1}) for path in self.records]
+        with patch('src.utils.secure_data.os.fsync', side_effect=OSError("disk full")):
+            with self.assertRaises(DataError):
+                secure_save_many(updated)
+        
+        self._assert_round_trip()
+
+
+if __name__ == '__main__':
+    unittest.main()